@@ -0,0 +1,235 @@
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from typing import Dict, List, Optional
+
+API_PREFIX = '/graph/v1'
+SEARCH_RESULT_CAP = 1000
+BULK_PAGE_SIZE = 1000
+
+
+def _seed(*parts) -> int:
+    return int.from_bytes(hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).digest()[:8], 'big')
+
+
+def parse_year_filter(value: Optional[str]) -> Optional[List[int]]:
+    """Years selected by a ``year`` parameter such as 2001 or 2001-2005"""
+    if not value:
+        return None
+    start, _, end = value.partition('-')
+    return list(range(int(start), int(end or start) + 1))
+
+
+def synthetic_paper(query: str, index: int, fields: List[str], year: Optional[int] = None) -> Dict:
+    """Deterministic paper payload for result ``index`` of ``query``, published in ``year`` if given"""
+    if year is not None:
+        query = f"{query}|{year}"
+    rng = random.Random(_seed(query, index))
+    paper_id = hashlib.sha1(f"{query}|{index}".encode('utf-8')).hexdigest()
+    paper = {
+        'paperId': paper_id,
+        'externalIds': {'DOI': f"10.5555/{paper_id[:12]}"} if rng.random() < 0.6 else {},
+        'title': f"{query.title()} study {index}: {rng.choice(['On', 'Towards', 'Notes on'])} {paper_id[:8]}",
+        'authors': [
+            {'authorId': str(rng.randint(1, 10 ** 8)), 'name': f"Author {rng.randint(1, 50000)}"}
+            for _ in range(rng.randint(1, 5))
+        ],
+        'abstract': ' '.join(f"word{rng.randint(0, 5000)}" for _ in range(rng.randint(80, 250))),
+        'year': year if year is not None else rng.randint(1950, 2024),
+        'citationCount': int(rng.paretovariate(1.2)) - 1,
+        'url': f"https://www.semanticscholar.org/paper/{paper_id}",
+        'fieldsOfStudy': ['Mathematics'],
+    }
+    return {key: value for key, value in paper.items() if key in fields or key == 'paperId'}
+
+
+class FakeScholarState:
+    """Configuration and counters shared by all request handlers"""
+
+    def __init__(self, results_per_query: int = 500, latency: float = 0.0, throttle_rate: float = 0.0):
+        # With a year filter, each selected year contributes this many results
+        self.results_per_query = results_per_query
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.requests = 0
+        self.throttled = 0
+        # paperId -> (query, index, year) of every paper handed out, for /paper/batch
+        self.issued: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+
+    def count(self) -> bool:
+        """Count a request and decide whether it gets a 429"""
+        with self._lock:
+            self.requests += 1
+            throttle = self._rng.random() < self.throttle_rate
+            if throttle:
+                self.throttled += 1
+            return throttle
+
+
+class FakeScholarHandler(BaseHTTPRequestHandler):
+    """Serves /paper/search, /paper/search/bulk and /paper/batch with synthetic results"""
+
+    state: FakeScholarState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _admit(self) -> bool:
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        if self.state.count():
+            self._send_json(429, {'message': 'Too Many Requests'}, {'Retry-After': '0'})
+            return False
+        return True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        handlers = {
+            f"{API_PREFIX}/paper/search": self._search,
+            f"{API_PREFIX}/paper/search/bulk": self._search_bulk,
+        }
+        if url.path not in handlers:
+            self._send_json(404, {'error': f"Unknown path {url.path}"})
+            return
+        if not self._admit():
+            return
+        handlers[url.path](params)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if url.path != f"{API_PREFIX}/paper/batch":
+            self._send_json(404, {'error': f"Unknown path {url.path}"})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not self._admit():
+            return
+        self._batch(params, body.get('ids') or [])
+
+    def _total(self, years: Optional[List[int]]) -> int:
+        return self.state.results_per_query * (len(years) if years else 1)
+
+    def _papers(self, query: str, years: Optional[List[int]], start: int, end: int, fields: List[str]) -> List[Dict]:
+        per_year = self.state.results_per_query
+        keys = [
+            (query, index % per_year, years[index // per_year]) if years else (query, index, None)
+            for index in range(start, end)
+        ]
+        papers = [synthetic_paper(*key[:2], fields, key[2]) for key in keys]
+        with self.state._lock:
+            for key, paper in zip(keys, papers):
+                self.state.issued[paper['paperId']] = key
+        return papers
+
+    def _search(self, params: Dict):
+        query = params.get('query', '')
+        offset = int(params.get('offset', 0))
+        limit = int(params.get('limit', 100))
+        fields = params.get('fields', 'title').split(',')
+        years = parse_year_filter(params.get('year'))
+        if offset + limit > SEARCH_RESULT_CAP:
+            self._send_json(400, {'error': 'offset + limit must be < 1000'})
+            return
+        total = self._total(years)
+        end = min(offset + limit, total)
+        response = {
+            'total': total,
+            'offset': offset,
+            'data': self._papers(query, years, offset, end, fields),
+        }
+        if end < min(total, SEARCH_RESULT_CAP):
+            response['next'] = end
+        self._send_json(200, response)
+
+    def _search_bulk(self, params: Dict):
+        query = params.get('query', '')
+        offset = int(params.get('token') or 0)
+        fields = params.get('fields', 'title').split(',')
+        years = parse_year_filter(params.get('year'))
+        total = self._total(years)
+        end = min(offset + BULK_PAGE_SIZE, total)
+        self._send_json(200, {
+            'total': total,
+            'token': str(end) if end < total else None,
+            'data': self._papers(query, years, offset, end, fields),
+        })
+
+    def _batch(self, params: Dict, ids: List[str]):
+        if len(ids) > 500:
+            self._send_json(400, {'error': 'At most 500 ids per request'})
+            return
+        fields = params.get('fields', 'title').split(',')
+        with self.state._lock:
+            known = [self.state.issued.get(paper_id) for paper_id in ids]
+        self._send_json(200, [synthetic_paper(key[0], key[1], fields, key[2]) if key else None for key in known])
+
+
+class FakeScholarServer:
+    """Runs the fake API on a background thread; use as a context manager"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **options):
+        self.state = FakeScholarState(**options)
+        handler = type('BoundFakeScholarHandler', (FakeScholarHandler,), {'state': self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start(self) -> 'FakeScholarServer':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a fake Semantic Scholar search API')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--results-per-query', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with 429')
+    args = parser.parse_args()
+
+    server = FakeScholarServer(port=args.port, results_per_query=args.results_per_query,
+                               latency=args.latency, throttle_rate=args.throttle_rate)
+    print(f"Serving fake Semantic Scholar API at {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""End-to-end crawler benchmark against the fake Semantic Scholar server.
+
+Run from ``src/``::
+
+    python -m benchmarks.run_benchmark --topics 3 --results-per-query 500
+
+Reports papers/sec, API calls per paper, DB statements per paper and peak RSS
+as JSON. Uses a throwaway SQLite database unless ``--database-url`` is given.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the crawler against a fake Semantic Scholar API')
+    parser.add_argument('--topics', type=int, default=3, help='Number of MATH_TOPICS to crawl')
+    parser.add_argument('--year', type=int, default=2001)
+    parser.add_argument('--year-end', type=int, help='Crawl the range --year..--year-end (default: --year only)')
+    parser.add_argument('--max-results', type=int, help='Maximum papers per topic')
+    parser.add_argument('--results-per-query', type=int, default=500, help='Hits the fake API reports per query and year')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of simulated latency per API call')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of API calls answered with 429')
+    parser.add_argument('--mode', choices=['sequential', 'async', 'bulk'], default='sequential')
+    parser.add_argument('--concurrency', type=int, default=4, help='Units crawled at once in async mode')
+    parser.add_argument('--database-url', help='Database to write to (default: temporary SQLite file)')
+    parser.add_argument('--output', type=Path, help='Also write the report to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Keep INFO logging enabled')
+    return parser.parse_args(argv)
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = Path(tempfile.mkdtemp(prefix='crawler_bench_'))
+
+    from benchmarks.fake_s2_server import FakeScholarServer
+    server = FakeScholarServer(results_per_query=args.results_per_query, latency=args.latency,
+                               throttle_rate=args.throttle_rate).start()
+
+    # Settings are read at import time, so configure before importing the crawler
+    os.environ['S2_API_URL'] = server.base_url
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{workdir / 'bench.db'}"
+    os.environ.setdefault('REQUESTS_PER_SECOND', '10000')
+    os.environ.setdefault('RATE_BURST', '100')
+    os.environ['CACHE_MODE'] = 'off'
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    from sqlalchemy import event
+    from config.settings import MATH_TOPICS
+    from database.session import get_engine, init_db
+
+    init_db()
+    statements = {'count': 0}
+
+    @event.listens_for(get_engine(), 'before_cursor_execute')
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements['count'] += 1
+
+    topics = MATH_TOPICS[:args.topics]
+    started = time.perf_counter()
+    try:
+        if args.mode == 'async':
+            from crawler.async_crawler import run_async_crawl
+            stats = run_async_crawl(topics, args.year, args.year_end or args.year, concurrency=args.concurrency,
+                                    max_results=args.max_results, resume=False)
+            papers = stats['papers_fetched']
+        else:
+            from crawler.scholar_crawler import ScholarCrawler
+            crawler = ScholarCrawler()
+            crawler.data_dir = workdir
+            crawl = crawler.bulk_crawl if args.mode == 'bulk' else crawler.crawl_math_papers
+            statements['count'] = 0
+            papers = 0
+            for topic in topics:
+                papers += crawl(topic=topic, year=args.year, year_end=args.year_end,
+                                max_results=args.max_results, resume=False)
+    finally:
+        elapsed = time.perf_counter() - started
+        server.stop()
+
+    report = {
+        'mode': args.mode,
+        'topics': len(topics),
+        'papers': papers,
+        'elapsed_seconds': round(elapsed, 3),
+        'papers_per_second': round(papers / elapsed, 1) if elapsed else None,
+        'api_calls': server.state.requests,
+        'api_throttled': server.state.throttled,
+        'api_calls_per_paper': round(server.state.requests / papers, 4) if papers else None,
+        'db_statements': statements['count'],
+        'db_statements_per_paper': round(statements['count'] / papers, 4) if papers else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
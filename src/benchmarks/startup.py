@@ -0,0 +1,77 @@
+"""Startup-time benchmark of the command line entry points.
+
+Run from ``src/``::
+
+    python -m benchmarks.startup --runs 10
+
+Times ``<script> --help`` for every entry point in a fresh interpreter,
+next to a bare ``python -c pass`` for reference, and lists the slowest
+imports of the given modules as reported by ``python -X importtime``.
+Needs no database.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = ['main.py', 'run_all_topics.py', 'search_papers.py', 'export_papers.py',
+                'refresh_citations.py', 'init_db.py']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Measure start-up time of the crawler entry points')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs per command')
+    parser.add_argument('--scripts', nargs='+', default=ENTRY_POINTS, help='Entry points to time with --help')
+    parser.add_argument('--modules', nargs='+', default=['crawler.scholar_crawler'],
+                        help='Modules whose slowest imports are listed')
+    parser.add_argument('--top', type=int, default=10, help='Imports listed per module')
+    parser.add_argument('--output', type=Path, help='Also write the report to this JSON file')
+    return parser.parse_args(argv)
+
+
+def time_command(command, runs: int) -> dict:
+    """Median and fastest wall time of ``command`` in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=SRC_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {'median_ms': round(statistics.median(timings), 1), 'min_ms': round(min(timings), 1)}
+
+
+def slowest_imports(module: str, top: int) -> list:
+    """Imports of ``module`` with the largest cumulative time, from -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=SRC_DIR, capture_output=True, text=True, check=False)
+    imports = []
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append({'module': name.strip(), 'cumulative_ms': round(int(cumulative) / 1000, 1)})
+    return sorted(imports, key=lambda entry: entry['cumulative_ms'], reverse=True)[:top]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {
+        'python': sys.version.split()[0],
+        'runs': args.runs,
+        'interpreter': time_command([sys.executable, '-c', 'pass'], args.runs),
+        'help': {script: time_command([sys.executable, script, '--help'], args.runs) for script in args.scripts},
+        'imports': {module: slowest_imports(module, args.top) for module in args.modules},
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == "__main__":
+    main()
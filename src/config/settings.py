@@ -12,7 +12,14 @@ DB_CONFIG = {
     'port': os.getenv('POSTGRES_PORT', '5432'),
     'database': os.getenv('POSTGRES_DB', 'scholar_db'),
     'user': os.getenv('POSTGRES_USER', 'postgres'),
-    'password': os.getenv('POSTGRES_PASSWORD', 'postgres')
+    'password': os.getenv('POSTGRES_PASSWORD', 'postgres'),
+    # Full SQLAlchemy URL; when set it replaces the Postgres settings above
+    'url': os.getenv('DATABASE_URL'),
+    'pool_size': int(os.getenv('DB_POOL_SIZE', '5')),
+    'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+    'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800')),
+    'echo': os.getenv('DB_ECHO', 'false').lower() in ('1', 'true', 'yes')
 }
 
 # Crawler configuration
@@ -22,7 +29,66 @@ CRAWLER_CONFIG = {
         'end': 2024
     },
     'delay_between_requests': 2.0,
-    'max_retries': 3
+    'max_retries': 3,
+    'api_base_url': os.getenv('S2_API_URL', 'https://api.semanticscholar.org/graph/v1'),
+    'api_key': os.getenv('S2_API_KEY'),
+    'page_size': 100,
+    # Field of study filter applied by bulk search
+    'fields_of_study': 'Mathematics',
+    # Token bucket shared by all API requests of a process
+    'requests_per_second': float(os.getenv('REQUESTS_PER_SECOND', '1.0')),
+    'rate_burst': int(os.getenv('RATE_BURST', '1')),
+    # 'local' paces each process on its own; 'shared' draws from one bucket in the database
+    'rate_budget': os.getenv('RATE_BUDGET', 'local'),
+    # Work-queue mode: seconds a claimed unit stays leased without a heartbeat
+    'lease_seconds': float(os.getenv('LEASE_SECONDS', '300')),
+    'max_throttle_retries': 10,
+    # Papers are upserted in batches of this size or after this many seconds
+    'db_batch_size': int(os.getenv('DB_BATCH_SIZE', '500')),
+    'db_flush_interval': float(os.getenv('DB_FLUSH_INTERVAL', '5.0')),
+    # Fetch threads and bounded queue length of the producer/consumer pipeline
+    'pipeline_fetch_workers': int(os.getenv('PIPELINE_FETCH_WORKERS', '1')),
+    'pipeline_queue_size': int(os.getenv('PIPELINE_QUEUE_SIZE', '4')),
+    # Citation refresh: papers re-fetched per batch and minimum days between refreshes of a paper
+    'refresh_batch_size': int(os.getenv('REFRESH_BATCH_SIZE', '500')),
+    'refresh_min_age_days': float(os.getenv('REFRESH_MIN_AGE_DAYS', '7')),
+    # Per-run output files: any of csv, jsonl, parquet, arrow; compression: gzip, zstd or unset
+    'output_formats': [f.strip() for f in os.getenv('OUTPUT_FORMATS', 'csv,jsonl').split(',') if f.strip()],
+    'output_compression': os.getenv('OUTPUT_COMPRESSION') or None,
+    # Partitioned database export (export_papers.py): parquet or arrow, papers per batch, and
+    # how old a paper must be before it is exported so concurrent inserts are not skipped
+    'export_dir': Path(os.getenv('EXPORT_DIR', Path(__file__).parent.parent / 'crawler' / 'data' / 'export')),
+    'export_format': os.getenv('EXPORT_FORMAT', 'parquet'),
+    'export_compression': os.getenv('EXPORT_COMPRESSION', 'zstd'),
+    'export_batch_size': int(os.getenv('EXPORT_BATCH_SIZE', '10000')),
+    'export_settle_seconds': float(os.getenv('EXPORT_SETTLE_SECONDS', '60')),
+    # Scheduled crawl (CRAWL_MODE=scheduled): API requests per run and per topic, requests per
+    # slice before a unit is re-ranked, and days before a completed unit is crawled again
+    'scheduler_request_budget': int(os.getenv('REQUEST_BUDGET', '1000')),
+    'scheduler_topic_quota': int(os.getenv('TOPIC_QUOTA')) if os.getenv('TOPIC_QUOTA') else None,
+    'scheduler_slice_requests': int(os.getenv('SCHEDULER_SLICE_REQUESTS', '5')),
+    'scheduler_stale_days': float(os.getenv('SCHEDULER_STALE_DAYS', '30')),
+    # On-disk API response cache: off, read-through or offline (replay only)
+    'cache_mode': os.getenv('CACHE_MODE', 'off'),
+    'cache_path': Path(os.getenv('CACHE_PATH', Path(__file__).parent.parent / 'crawler' / 'data' / 'http_cache.sqlite3')),
+    'cache_ttl': float(os.getenv('CACHE_TTL', str(7 * 24 * 3600))),
+    'cache_max_entries': int(os.getenv('CACHE_MAX_ENTRIES', '100000')),
+    # Metrics: Prometheus /metrics port and/or a JSON file rewritten every interval seconds
+    'metrics_port': int(os.getenv('METRICS_PORT')) if os.getenv('METRICS_PORT') else None,
+    'metrics_json_path': os.getenv('METRICS_JSON_PATH') or None,
+    'metrics_interval': float(os.getenv('METRICS_INTERVAL', '10'))
+}
+
+# Logging configuration
+LOG_CONFIG = {
+    'level': os.getenv('LOG_LEVEL', 'INFO').upper(),
+    'dir': Path(os.getenv('LOG_DIR', Path.cwd() / 'logs')),
+    'max_bytes': int(os.getenv('LOG_MAX_BYTES', str(50 * 1024 * 1024))),
+    'backup_count': int(os.getenv('LOG_BACKUP_COUNT', '5')),
+    # Progress lines: aggregated (one summary per interval), sampled (every N papers) or off
+    'progress_mode': os.getenv('PROGRESS_LOG_MODE', 'aggregated'),
+    'progress_interval': float(os.getenv('PROGRESS_LOG_INTERVAL', '10')),
+    'progress_every': int(os.getenv('PROGRESS_LOG_EVERY', '1000'))
 }
 
 # Math topics to crawl
@@ -0,0 +1,164 @@
+import threading
+import time
+import requests
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+from config.settings import CRAWLER_CONFIG
+from crawler.cache import CacheMiss, ResponseCache
+from crawler.rate_limiter import RateLimiter, get_rate_limiter
+from crawler.utils.logger import setup_logger
+from crawler.utils.metrics import API_REQUEST_SECONDS, API_REQUESTS, API_RETRIES, API_THROTTLED
+
+logger = setup_logger(__name__)
+
+DEFAULT_FIELDS = ['paperId', 'externalIds', 'title', 'authors', 'abstract', 'year',
+                  'citationCount', 'url', 'fieldsOfStudy']
+# Just enough to deduplicate bulk search hits before hydrating them
+BULK_SEARCH_FIELDS = ['paperId', 'title']
+# Maximum number of ids accepted by POST /paper/batch
+BATCH_SIZE = 500
+
+
+class SemanticScholarError(Exception):
+    """Raised when the Semantic Scholar API returns an unrecoverable error"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class SemanticScholarClient:
+    """Thin HTTP client for the Semantic Scholar Graph API"""
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None,
+                 timeout: float = 30.0, max_retries: Optional[int] = None,
+                 rate_limiter: Optional[RateLimiter] = None, cache: Optional[ResponseCache] = None):
+        self.base_url = (base_url or CRAWLER_CONFIG['api_base_url']).rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries if max_retries is not None else CRAWLER_CONFIG['max_retries']
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.cache = cache
+        self.requests_sent = 0
+        self._thread_counts = threading.local()
+        self.http = requests.Session()
+        api_key = api_key or CRAWLER_CONFIG.get('api_key')
+        if api_key:
+            self.http.headers['x-api-key'] = api_key
+
+    def thread_requests_sent(self) -> int:
+        """Requests sent by the calling thread, for per-stage accounting"""
+        return getattr(self._thread_counts, 'sent', 0)
+
+    def close(self):
+        """Close the HTTP session and response cache; both reopen if the client is used again"""
+        self.http.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def _request(self, method: str, path: str, params: Optional[Dict] = None,
+                 json_body: Optional[Dict] = None, max_retries: Optional[int] = None) -> Dict:
+        """Return the decoded JSON body, from the response cache when possible"""
+        if self.cache is None:
+            return self._send(method, path, params, json_body, max_retries)
+        key = self.cache.make_key(method, path, params, json_body)
+        try:
+            cached = self.cache.get(key)
+        except CacheMiss as e:
+            raise SemanticScholarError(str(e)) from e
+        if cached is not None:
+            return cached
+        response = self._send(method, path, params, json_body, max_retries)
+        self.cache.put(key, response)
+        return response
+
+    def _send(self, method: str, path: str, params: Optional[Dict] = None,
+              json_body: Optional[Dict] = None, max_retries: Optional[int] = None) -> Dict:
+        """Send a request and return the decoded JSON body, retrying on failure"""
+        url = f"{self.base_url}{path}"
+        attempts = max_retries if max_retries is not None else self.max_retries
+        attempt = 0
+        throttled = 0
+        while True:
+            self.rate_limiter.acquire()
+            self.requests_sent += 1
+            self._thread_counts.sent = self.thread_requests_sent() + 1
+            try:
+                with API_REQUEST_SECONDS.time(endpoint=path):
+                    response = self.http.request(method, url, params=params, json=json_body, timeout=self.timeout)
+                API_REQUESTS.inc(endpoint=path, status=response.status_code)
+                if response.status_code == 429 and throttled < CRAWLER_CONFIG['max_throttle_retries']:
+                    # Throttling is not a failure of the request itself, so it
+                    # only slows the shared bucket down and does not use up an attempt
+                    throttled += 1
+                    API_THROTTLED.inc()
+                    self.rate_limiter.penalize(parse_retry_after(response.headers.get('Retry-After')))
+                    continue
+                response.raise_for_status()
+                self.rate_limiter.record_success()
+                return response.json()
+            except requests.RequestException as e:
+                attempt += 1
+                if attempt < attempts:
+                    API_RETRIES.inc()
+                    backoff = CRAWLER_CONFIG['delay_between_requests'] * 2 ** (attempt - 1)
+                    logger.warning(f"Attempt {attempt} for {path} failed: {e}. Retrying in {backoff:.1f}s...")
+                    time.sleep(backoff)
+                else:
+                    logger.error(f"All {attempts} attempts for {path} failed: {e}")
+                    raise SemanticScholarError(str(e)) from e
+
+    def search(self, query: str, offset: int = 0, limit: int = 100,
+               fields: Optional[List[str]] = None, year: Optional[str] = None,
+               max_retries: Optional[int] = None) -> Dict:
+        """Relevance search; returns the raw page with 'total', 'offset', 'next' and 'data'
+
+        ``year`` restricts results to a year ("2001") or an inclusive range ("2001-2005").
+        """
+        params = {
+            'query': query,
+            'offset': offset,
+            'limit': limit,
+            'fields': ','.join(fields or DEFAULT_FIELDS),
+        }
+        if year:
+            params['year'] = year
+        return self._request('GET', '/paper/search', params=params, max_retries=max_retries)
+
+    def search_bulk(self, query: str, token: Optional[str] = None, fields: Optional[List[str]] = None,
+                    year: Optional[str] = None, fields_of_study: Optional[str] = None,
+                    max_retries: Optional[int] = None) -> Dict:
+        """Bulk search; returns up to 1000 papers per page with 'total', 'token' and 'data'"""
+        params = {
+            'query': query,
+            'fields': ','.join(fields or BULK_SEARCH_FIELDS),
+        }
+        if token:
+            params['token'] = token
+        if year:
+            params['year'] = year
+        if fields_of_study:
+            params['fieldsOfStudy'] = fields_of_study
+        return self._request('GET', '/paper/search/bulk', params=params, max_retries=max_retries)
+
+    def get_papers(self, paper_ids: List[str], fields: Optional[List[str]] = None,
+                   max_retries: Optional[int] = None) -> List[Dict]:
+        """Fetch full records for up to BATCH_SIZE ids; unknown ids are left out"""
+        papers = []
+        for start in range(0, len(paper_ids), BATCH_SIZE):
+            chunk = paper_ids[start:start + BATCH_SIZE]
+            response = self._request('POST', '/paper/batch', params={'fields': ','.join(fields or DEFAULT_FIELDS)},
+                                     json_body={'ids': chunk}, max_retries=max_retries)
+            papers.extend(paper for paper in response if paper)
+        return papers
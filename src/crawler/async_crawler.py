@@ -0,0 +1,291 @@
+import asyncio
+import time
+import aiohttp
+from typing import Dict, Iterable, List, Optional
+from config.settings import CRAWLER_CONFIG
+from crawler.api_client import DEFAULT_FIELDS, SemanticScholarError, parse_retry_after
+from crawler.cache import CacheMiss, ResponseCache, get_response_cache
+from crawler.dedup import SeenSet
+from crawler.paginator import AsyncSearchPaginator, SearchCursor
+from crawler.rate_limiter import RateLimiter, get_rate_limiter
+from crawler.records import PaperRecord
+from crawler.scholar_crawler import build_search_query, build_search_text
+from crawler.utils.logger import setup_logger
+from crawler.utils.metrics import API_REQUEST_SECONDS, API_REQUESTS, API_RETRIES, API_THROTTLED, PAPERS_PROCESSED, QUEUE_DEPTH
+from database.checkpoints import CheckpointStore, STATUS_COMPLETED, STATUS_FAILED, STATUS_IN_PROGRESS
+from database.models import CrawlState
+from database.session import get_session
+from database.writer import PaperBatchWriter
+
+logger = setup_logger(__name__)
+
+
+class AsyncSemanticScholarClient:
+    """aiohttp counterpart of SemanticScholarClient sharing the same rate limiter"""
+
+    def __init__(self, http: aiohttp.ClientSession, base_url: Optional[str] = None,
+                 max_retries: Optional[int] = None, rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.http = http
+        self.base_url = (base_url or CRAWLER_CONFIG['api_base_url']).rstrip('/')
+        self.max_retries = max_retries if max_retries is not None else CRAWLER_CONFIG['max_retries']
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.cache = cache
+
+    async def _request(self, method: str, path: str, params: Optional[Dict] = None,
+                       json_body: Optional[Dict] = None, max_retries: Optional[int] = None) -> Dict:
+        """Return the decoded JSON body, from the response cache when possible"""
+        if self.cache is None:
+            return await self._send(method, path, params, json_body, max_retries)
+        key = self.cache.make_key(method, path, params, json_body)
+        try:
+            cached = self.cache.get(key)
+        except CacheMiss as e:
+            raise SemanticScholarError(str(e)) from e
+        if cached is not None:
+            return cached
+        response = await self._send(method, path, params, json_body, max_retries)
+        self.cache.put(key, response)
+        return response
+
+    async def _send(self, method: str, path: str, params: Optional[Dict] = None,
+                    json_body: Optional[Dict] = None, max_retries: Optional[int] = None) -> Dict:
+        """Send a request and return the decoded JSON body, retrying on failure"""
+        url = f"{self.base_url}{path}"
+        attempts = max_retries if max_retries is not None else self.max_retries
+        attempt = 0
+        throttled = 0
+        while True:
+            await self.rate_limiter.acquire_async()
+            started = time.perf_counter()
+            try:
+                async with self.http.request(method, url, params=params, json=json_body) as response:
+                    API_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=path)
+                    API_REQUESTS.inc(endpoint=path, status=response.status)
+                    if response.status == 429 and throttled < CRAWLER_CONFIG['max_throttle_retries']:
+                        throttled += 1
+                        API_THROTTLED.inc()
+                        await self.rate_limiter.penalize_async(parse_retry_after(response.headers.get('Retry-After')))
+                        continue
+                    response.raise_for_status()
+                    self.rate_limiter.record_success()
+                    return await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                attempt += 1
+                if attempt < attempts:
+                    API_RETRIES.inc()
+                    backoff = CRAWLER_CONFIG['delay_between_requests'] * 2 ** (attempt - 1)
+                    logger.warning(f"Attempt {attempt} for {path} failed: {e}. Retrying in {backoff:.1f}s...")
+                    await asyncio.sleep(backoff)
+                else:
+                    logger.error(f"All {attempts} attempts for {path} failed: {e}")
+                    raise SemanticScholarError(str(e)) from e
+
+    async def search(self, query: str, offset: int = 0, limit: int = 100,
+                     fields: Optional[List[str]] = None, year: Optional[str] = None,
+                     max_retries: Optional[int] = None) -> Dict:
+        """Relevance search; returns the raw page with 'total', 'offset', 'next' and 'data'"""
+        params = {
+            'query': query,
+            'offset': offset,
+            'limit': limit,
+            'fields': ','.join(fields or DEFAULT_FIELDS),
+        }
+        if year:
+            params['year'] = year
+        return await self._request('GET', '/paper/search', params=params, max_retries=max_retries)
+
+
+class AsyncCrawler:
+    """Crawls topic x year units concurrently into the database.
+
+    Fetch tasks share one rate limiter and hand their pages to a single writer
+    task, which owns the only database session and commits each page together
+    with the unit's crawl_state checkpoint. A unit whose fetch or write fails
+    is marked failed at its last stored page without affecting the others.
+    Completed units are skipped and partial ones resume from their stored offset.
+    If the writer itself dies, the fetchers are cancelled and ``run`` re-raises its error.
+    This mode stores to the database only; it does not write CSV/JSON files.
+    """
+
+    def __init__(self, concurrency: int = 4, max_results: Optional[int] = None,
+                 report_interval: float = 30.0, resume: bool = True, cache_mode: Optional[str] = None):
+        self.concurrency = concurrency
+        self.cache_mode = cache_mode
+        self.max_results = max_results
+        self.report_interval = report_interval
+        self.resume = resume
+        self.requests_made = 0
+        self.papers_fetched = 0
+        self.papers_inserted = 0
+        self.papers_skipped = 0
+        self.failed_units: List[tuple] = []
+        # (topic, year) of units whose pages could not be stored; their later pages are dropped
+        self._write_failed = set()
+        self._started = 0.0
+
+    def stats(self) -> Dict:
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        return {
+            'elapsed_seconds': round(elapsed, 1),
+            'requests': self.requests_made,
+            'papers_fetched': self.papers_fetched,
+            'papers_inserted': self.papers_inserted,
+            'papers_skipped': self.papers_skipped,
+            'papers_per_second': round(self.papers_fetched / elapsed, 2),
+            'requests_per_second': round(self.requests_made / elapsed, 2),
+            'failed_units': len(self.failed_units),
+        }
+
+    def _load_units(self, checkpoints: CheckpointStore, topics: Iterable[str], years: Iterable[int]) -> List[CrawlState]:
+        """Checkpoints of the units that still need crawling"""
+        states = []
+        for year in years:
+            for topic in topics:
+                state = checkpoints.load(build_search_query(topic, year), topic, year)
+                if not self.resume:
+                    checkpoints.reset(state)
+                elif state.status == STATUS_COMPLETED:
+                    continue
+                states.append(state)
+        return states
+
+    async def _crawl_unit(self, client: AsyncSemanticScholarClient, semaphore: asyncio.Semaphore,
+                          queue: asyncio.Queue, state: CrawlState):
+        async with semaphore:
+            unit = (state.topic, state.year)
+            cursor = SearchCursor(offset=state.offset, token=state.token)
+            paginator = AsyncSearchPaginator(client, build_search_text(state.topic), page_size=CRAWLER_CONFIG['page_size'],
+                                             max_results=self.max_results, cursor=cursor,
+                                             year=str(state.year) if state.year else None)
+            reported = 0
+            try:
+                async for page in paginator.pages():
+                    if unit in self._write_failed:
+                        logger.info(f"Stopped fetching {unit[0]}/{unit[1]} at {cursor} after a failed write")
+                        break
+                    self.papers_fetched += len(page)
+                    await queue.put((state, SearchCursor(**cursor.to_dict()), paginator.requests_made - reported, page))
+                    reported = paginator.requests_made
+            except Exception as e:
+                # Any error fails this unit only; the other units and the writer keep going
+                logger.error(f"Unit {unit[0]}/{unit[1]} failed at {cursor}: {e}")
+                self.failed_units.append(unit)
+                await queue.put((state, None, paginator.requests_made - reported, None))
+                return
+            finally:
+                self.requests_made += paginator.requests_made
+            if unit in self._write_failed:
+                return
+            # Records completion when the last request came back empty
+            await queue.put((state, SearchCursor(**cursor.to_dict()), paginator.requests_made - reported, []))
+            logger.info(f"Completed {unit[0]}/{unit[1]}: {paginator.yielded} papers in {paginator.requests_made} requests")
+
+    def _write_page(self, batch_writer: PaperBatchWriter, checkpoints: CheckpointStore, item: tuple):
+        state, cursor, requests, page = item
+        unit = (state.topic, state.year)
+        if unit in self._write_failed:
+            return
+        if cursor is None:
+            checkpoints.mark(state, STATUS_FAILED)
+            return
+        try:
+            for paper in page:
+                record = PaperRecord.from_api(paper, state.topic)
+                if record.title:
+                    batch_writer.add(record)
+                    PAPERS_PROCESSED.inc()
+            # The checkpoint is committed in the same transaction as the page's papers
+            result = batch_writer.flush(lambda result: checkpoints.advance(
+                state, cursor.offset, cursor.token,
+                papers_stored=result.inserted,
+                requests=requests,
+                status=STATUS_COMPLETED if cursor.exhausted else STATUS_IN_PROGRESS
+            ))
+        except Exception as e:
+            logger.error(f"Error storing page for {unit[0]}/{unit[1]}, failing the unit at its last stored page: {e}")
+            self._write_failed.add(unit)
+            self.failed_units.append(unit)
+            checkpoints.mark(state, STATUS_FAILED)
+            return
+        self.papers_inserted += result.inserted
+        self.papers_skipped += result.skipped
+
+    async def _writer(self, session, queue: asyncio.Queue):
+        """Single consumer that serializes all database writes"""
+        seen = SeenSet()
+        await asyncio.to_thread(seen.warm, session)
+        batch_writer = PaperBatchWriter(session, batch_size=CRAWLER_CONFIG['db_batch_size'], seen=seen)
+        checkpoints = CheckpointStore(session)
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    return
+                await asyncio.to_thread(self._write_page, batch_writer, checkpoints, item)
+            except Exception as e:
+                logger.error(f"Error storing page for {item[0]}: {e}")
+            finally:
+                queue.task_done()
+
+    @staticmethod
+    async def _unless_writer_fails(writer: asyncio.Task, awaitable):
+        """Await ``awaitable``, cancelling it and re-raising if the writer dies first"""
+        task = asyncio.ensure_future(awaitable)
+        await asyncio.wait({task, writer}, return_when=asyncio.FIRST_COMPLETED)
+        if not task.done():
+            # Nothing drains the bounded queue any more, so fetchers would wait forever
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            writer.result()
+            raise RuntimeError("Database writer stopped before the crawl finished")
+        return task.result()
+
+    async def _reporter(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            logger.info(f"Throughput: {self.stats()}")
+
+    async def run(self, topics: Iterable[str], years: Iterable[int]) -> Dict:
+        """Crawl every (topic, year) pair and return aggregate throughput stats"""
+        self._started = time.monotonic()
+        session = get_session()
+        try:
+            states = self._load_units(CheckpointStore(session), list(topics), list(years))
+            logger.info(f"Starting async crawl of {len(states)} units with concurrency {self.concurrency}")
+            semaphore = asyncio.Semaphore(self.concurrency)
+            # Bounded so fetchers back off when the database falls behind
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+            QUEUE_DEPTH.set_function(queue.qsize, queue='async_writer')
+            writer = asyncio.create_task(self._writer(session, queue))
+            reporter = asyncio.create_task(self._reporter())
+            timeout = aiohttp.ClientTimeout(total=60)
+            headers = {'x-api-key': CRAWLER_CONFIG['api_key']} if CRAWLER_CONFIG.get('api_key') else None
+            cache = get_response_cache(self.cache_mode)
+            try:
+                async with aiohttp.ClientSession(timeout=timeout, headers=headers) as http:
+                    client = AsyncSemanticScholarClient(http, cache=cache)
+                    await self._unless_writer_fails(writer, asyncio.gather(*(
+                        self._crawl_unit(client, semaphore, queue, state) for state in states
+                    )))
+                await self._unless_writer_fails(writer, queue.put(None))
+                await writer
+            finally:
+                reporter.cancel()
+                if not writer.done():
+                    writer.cancel()
+                if cache is not None:
+                    cache.close()
+        finally:
+            session.close()
+        stats = self.stats()
+        logger.info(f"Async crawl completed: {stats}")
+        return stats
+
+
+def run_async_crawl(topics: Iterable[str], year_start: int, year_end: int,
+                    concurrency: int = 4, max_results: Optional[int] = None, resume: bool = True,
+                    cache_mode: Optional[str] = None) -> Dict:
+    """Run an AsyncCrawler over topics x years from synchronous code"""
+    crawler = AsyncCrawler(concurrency=concurrency, max_results=max_results, resume=resume, cache_mode=cache_mode)
+    return asyncio.run(crawler.run(list(topics), range(year_start, year_end + 1)))
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+from config.settings import CRAWLER_CONFIG
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CACHE_OFF = 'off'
+CACHE_READ_THROUGH = 'read-through'
+CACHE_OFFLINE = 'offline'
+CACHE_MODES = (CACHE_OFF, CACHE_READ_THROUGH, CACHE_OFFLINE)
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a request has no cached response"""
+
+
+class ResponseCache:
+    """SQLite-backed store of decoded API responses with TTL and LRU eviction.
+
+    Entries are keyed on the method, path, query parameters and body of a
+    request. In read-through mode expired entries are refetched; offline
+    replay serves whatever is stored regardless of age and never touches the
+    network. Once more than ``max_entries`` are stored the least recently
+    used ones are evicted. After ``close`` the next lookup reopens the file.
+    """
+
+    def __init__(self, path: Path, ttl: float = 7 * 24 * 3600, max_entries: int = 100000,
+                 mode: str = CACHE_READ_THROUGH):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}")
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = None
+        self._count = 0
+        with self._lock:
+            self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the cache file on first use or after ``close``; call with the lock held"""
+        if self._conn is None:
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " body BLOB NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)")
+            self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return self._conn
+
+    @staticmethod
+    def make_key(method: str, path: str, params: Optional[Dict] = None, json_body: Optional[Dict] = None) -> str:
+        payload = json.dumps([method.upper(), path, params or {}, json_body], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached response for ``key``; raises CacheMiss when offline"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT body, stored_at FROM responses WHERE key = ?", (key,)).fetchone()
+            fresh = row is not None and (self.mode == CACHE_OFFLINE or now - row[1] <= self.ttl)
+            if fresh:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        if fresh:
+            self.hits += 1
+            return json.loads(zlib.decompress(row[0]))
+        self.misses += 1
+        if self.mode == CACHE_OFFLINE:
+            raise CacheMiss(f"No cached response for request {key[:12]}")
+        return None
+
+    def put(self, key: str, response: Dict):
+        """Store a response and evict the least recently used entries if over capacity"""
+        body = zlib.compress(json.dumps(response, separators=(',', ':')).encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            inserted = self._connection().execute(
+                "INSERT OR REPLACE INTO responses (key, body, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, body, now, now)
+            ).rowcount
+            self._count += inserted
+            if self._count > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        # Trim a little below the limit so eviction does not run on every put
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = self._count - int(self.max_entries * 0.9)
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+            (excess,)
+        )
+        self._count -= excess
+        logger.info(f"Evicted {excess} cached responses")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def get_response_cache(mode: Optional[str] = None) -> Optional[ResponseCache]:
+    """Build the response cache configured in CRAWLER_CONFIG, or None when caching is off"""
+    mode = mode or CRAWLER_CONFIG['cache_mode']
+    if mode == CACHE_OFF:
+        return None
+    return ResponseCache(
+        CRAWLER_CONFIG['cache_path'],
+        ttl=CRAWLER_CONFIG['cache_ttl'],
+        max_entries=CRAWLER_CONFIG['cache_max_entries'],
+        mode=mode
+    )
@@ -0,0 +1,72 @@
+import hashlib
+import re
+import unicodedata
+from sqlalchemy import select
+from database.models import Paper
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def normalize_title(title: str) -> str:
+    """Case-, accent-width- and punctuation-insensitive form of a title"""
+    title = unicodedata.normalize('NFKC', title or '').casefold()
+    return _NON_WORD.sub(' ', title).strip()
+
+
+def hash64(value: str) -> int:
+    """Stable signed 64-bit hash, sized to fit a BIGINT column"""
+    digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def title_hash(title: str) -> int:
+    return hash64(normalize_title(title))
+
+
+class SeenSet:
+    """In-process set of 64-bit hashes of known paper ids and normalized titles.
+
+    Lets duplicates be dropped before any SQL runs. Warm it from the database
+    once at startup; afterwards it is kept current by ``add``.
+    """
+
+    def __init__(self):
+        self._paper_ids = set()
+        self._titles = set()
+
+    def __len__(self):
+        return len(self._titles)
+
+    def warm(self, session, chunk_size: int = 50000) -> int:
+        """Load the hashes of every stored paper"""
+        rows = session.execute(
+            select(Paper.paper_id, Paper.title_hash).execution_options(yield_per=chunk_size)
+        )
+        loaded = 0
+        for paper_id, stored_title_hash in rows:
+            if paper_id:
+                self._paper_ids.add(hash64(paper_id))
+            self._titles.add(stored_title_hash)
+            loaded += 1
+        logger.info(f"Warmed dedup index with {loaded} stored papers")
+        return loaded
+
+    def contains(self, paper) -> bool:
+        """Whether a PaperRecord's id or title is known"""
+        if paper.paper_id and hash64(paper.paper_id) in self._paper_ids:
+            return True
+        return paper.title_hash in self._titles
+
+    def add(self, paper):
+        if paper.paper_id:
+            self._paper_ids.add(hash64(paper.paper_id))
+        self._titles.add(paper.title_hash)
+
+    def discard(self, paper):
+        """Forget a paper, e.g. after the batch holding it failed to commit"""
+        if paper.paper_id:
+            self._paper_ids.discard(hash64(paper.paper_id))
+        self._titles.discard(paper.title_hash)
@@ -0,0 +1,145 @@
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from crawler.api_client import SemanticScholarClient, DEFAULT_FIELDS, BULK_SEARCH_FIELDS
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Relevance search refuses offset + limit beyond this many results
+SEARCH_RESULT_CAP = 1000
+
+
+class SearchCursor:
+    """Position within a paginated result set that can be saved and resumed"""
+
+    def __init__(self, offset: int = 0, token: Optional[str] = None, exhausted: bool = False):
+        self.offset = offset
+        self.token = token
+        self.exhausted = exhausted
+
+    def to_dict(self) -> Dict:
+        return {'offset': self.offset, 'token': self.token, 'exhausted': self.exhausted}
+
+    def __repr__(self):
+        return f"<SearchCursor(offset={self.offset}, token={self.token!r}, exhausted={self.exhausted})>"
+
+
+class SearchPaginator:
+    """Generator over search results that advances its cursor page by page.
+
+    Offset-paged responses carry ``next``; token-paged responses carry ``token``.
+    Iteration stops at ``max_results``, at the end of the results or at the
+    relevance search result cap, and the cursor always points at the first
+    result that has not been yielded yet. Token pages can only be resumed from
+    their start, so they are always yielded whole and may overshoot
+    ``max_results`` by up to one page.
+    """
+
+    def __init__(self, client: SemanticScholarClient, query: str, fields: Optional[List[str]] = None,
+                 page_size: int = 100, max_results: Optional[int] = None,
+                 cursor: Optional[SearchCursor] = None, max_retries: Optional[int] = None,
+                 year: Optional[str] = None):
+        self.client = client
+        self.query = query
+        self.year = year
+        self.fields = fields or DEFAULT_FIELDS
+        self.page_size = page_size
+        self.max_results = max_results
+        self.cursor = cursor or SearchCursor()
+        self.max_retries = max_retries
+        self.total: Optional[int] = None
+        self.requests_made = 0
+        self.yielded = 0
+
+    def _next_limit(self) -> int:
+        limit = min(self.page_size, SEARCH_RESULT_CAP - self.cursor.offset)
+        if self.max_results:
+            limit = min(limit, self.max_results - self.yielded)
+        return limit
+
+    def _fetch(self) -> Dict:
+        return self.client.search(self.query, offset=self.cursor.offset, limit=self._next_limit(),
+                                  fields=self.fields, year=self.year, max_retries=self.max_retries)
+
+    def _advance(self, response: Dict, consumed: int, page_len: int):
+        """Move the cursor past the consumed part of the page"""
+        if 'token' in response:
+            self.cursor.token = response.get('token')
+            self.cursor.offset += consumed
+            self.cursor.exhausted = self.cursor.token is None
+            return
+        self.cursor.offset += consumed
+        if consumed == page_len and response.get('next') is None:
+            self.cursor.exhausted = True
+        elif self.cursor.offset >= SEARCH_RESULT_CAP:
+            logger.warning(f"Reached the search result cap ({SEARCH_RESULT_CAP}) for query '{self.query}'")
+            self.cursor.exhausted = True
+
+    def _remaining(self) -> Optional[int]:
+        if not self.max_results:
+            return None
+        return self.max_results - self.yielded
+
+    def _consume(self, response: Dict, remaining: Optional[int]) -> List[Dict]:
+        """Trim a fetched page to what may still be yielded and advance the cursor"""
+        self.requests_made += 1
+        if self.total is None:
+            self.total = response.get('total')
+        data = response.get('data') or []
+        if not data:
+            self.cursor.exhausted = True
+            return []
+        # A token page cut short could never be resumed past its first part
+        page = data[:remaining] if remaining is not None and 'token' not in response else data
+        self._advance(response, len(page), len(data))
+        self.yielded += len(page)
+        return page
+
+    def _done(self) -> bool:
+        remaining = self._remaining()
+        return self.cursor.exhausted or (remaining is not None and remaining <= 0)
+
+    def pages(self) -> Iterator[List[Dict]]:
+        """Yield successive pages of raw paper dicts"""
+        while not self._done():
+            page = self._consume(self._fetch(), self._remaining())
+            if not page:
+                return
+            yield page
+
+    def __iter__(self) -> Iterator[Dict]:
+        for page in self.pages():
+            yield from page
+
+
+class BulkSearchPaginator(SearchPaginator):
+    """Walks bulk search results with continuation tokens, up to 1000 papers per page"""
+
+    def __init__(self, client: SemanticScholarClient, query: str, fields_of_study: Optional[str] = None, **kwargs):
+        kwargs.setdefault('fields', BULK_SEARCH_FIELDS)
+        super().__init__(client, query, **kwargs)
+        self.fields_of_study = fields_of_study
+
+    def _fetch(self) -> Dict:
+        return self.client.search_bulk(self.query, token=self.cursor.token, fields=self.fields,
+                                       year=self.year, fields_of_study=self.fields_of_study,
+                                       max_retries=self.max_retries)
+
+
+class AsyncSearchPaginator(SearchPaginator):
+    """SearchPaginator driven by a client whose methods are coroutines"""
+
+    async def pages(self) -> AsyncIterator[List[Dict]]:
+        """Yield successive pages of raw paper dicts"""
+        while not self._done():
+            page = self._consume(await self._fetch(), self._remaining())
+            if not page:
+                return
+            yield page
+
+    def __iter__(self):
+        raise TypeError("AsyncSearchPaginator must be iterated with 'async for'")
+
+    async def __aiter__(self) -> AsyncIterator[Dict]:
+        async for page in self.pages():
+            for paper in page:
+                yield paper
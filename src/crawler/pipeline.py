@@ -0,0 +1,286 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+from config.settings import CRAWLER_CONFIG
+from crawler.api_client import SemanticScholarClient, SemanticScholarError
+from crawler.dedup import SeenSet
+from crawler.paginator import SearchPaginator
+from crawler.records import PaperRecord
+from crawler.sinks import FileSink
+from crawler.utils.logger import ProgressLogger, setup_logger
+from crawler.utils.metrics import PAPERS_PROCESSED, QUEUE_DEPTH
+from database.checkpoints import CheckpointStore, STATUS_COMPLETED, STATUS_FAILED, STATUS_IN_PROGRESS
+from database.models import CrawlState
+from database.writer import PaperBatchWriter
+
+logger = setup_logger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class StageStats:
+    """Timing counters of one pipeline stage, summed over its threads"""
+
+    def __init__(self, name: str, inbox: Optional[queue.Queue] = None):
+        self.name = name
+        self.inbox = inbox
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        # Waiting for input vs. waiting for room downstream (backpressure)
+        self.idle_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, busy: float = 0.0, idle: float = 0.0, blocked: float = 0.0, items: int = 0, errors: int = 0):
+        with self._lock:
+            self.busy_seconds += busy
+            self.idle_seconds += idle
+            self.blocked_seconds += blocked
+            self.items += items
+            self.errors += errors
+
+    def to_dict(self) -> Dict:
+        return {
+            'items': self.items,
+            'errors': self.errors,
+            'busy_seconds': round(self.busy_seconds, 3),
+            'idle_seconds': round(self.idle_seconds, 3),
+            'blocked_seconds': round(self.blocked_seconds, 3),
+            'queue_depth': self.inbox.qsize() if self.inbox is not None else None,
+        }
+
+
+class Stage(threading.Thread):
+    """Worker thread applying ``handler`` to each item of ``inbox``.
+
+    ``handler`` returns an iterable of outputs, each of which is put on every
+    outbox. The stage stops after receiving one end marker per upstream
+    producer and then passes a single end marker downstream.
+    """
+
+    def __init__(self, name: str, handler: Callable[[object], Iterable], inbox: queue.Queue,
+                 outboxes: Sequence[queue.Queue], stats: StageStats, producers: int = 1):
+        super().__init__(name=name, daemon=True)
+        self.handler = handler
+        self.inbox = inbox
+        self.outboxes = outboxes
+        self.stats = stats
+        self.producers = producers
+
+    def _emit(self, item) -> float:
+        started = time.perf_counter()
+        for outbox in self.outboxes:
+            outbox.put(item)
+        return time.perf_counter() - started
+
+    def run(self):
+        remaining = self.producers
+        while remaining:
+            started = time.perf_counter()
+            item = self.inbox.get()
+            self.stats.record(idle=time.perf_counter() - started)
+            if item is _DONE:
+                remaining -= 1
+                continue
+            started = time.perf_counter()
+            blocked = 0.0
+            errors = 0
+            try:
+                for output in self.handler(item):
+                    blocked += self._emit(output)
+            except Exception as e:
+                errors = 1
+                logger.error(f"Stage {self.name} failed on an item: {e}")
+            self.stats.record(busy=time.perf_counter() - started - blocked, blocked=blocked, items=1, errors=errors)
+        self._emit(_DONE)
+
+
+class CrawlJob:
+    """One paginated search feeding the pipeline, with its checkpoint, output files and topic label"""
+
+    def __init__(self, paginator: SearchPaginator, pages: Iterator[List[Dict]],
+                 checkpoint: Optional[CrawlState] = None, sinks: Sequence[FileSink] = (),
+                 topic: Optional[str] = None):
+        self.paginator = paginator
+        self.pages = pages
+        self.checkpoint = checkpoint
+        self.sinks = sinks
+        self.topic = topic
+        self.processed = 0
+        self.inserted = 0
+        self.skipped = 0
+        self.failed = False
+        # Set when a page could not be stored; later pages are dropped so its checkpoint stays put
+        self.store_failed = False
+
+
+class PageItem:
+    """A fetched page travelling through the pipeline with the cursor reached after it"""
+
+    __slots__ = ('job', 'papers', 'offset', 'token', 'exhausted', 'requests', 'final')
+
+    def __init__(self, job: CrawlJob, papers: List[Dict], requests: int, final: bool = False):
+        cursor = job.paginator.cursor
+        self.job = job
+        self.papers = papers
+        self.offset = cursor.offset
+        self.token = cursor.token
+        self.exhausted = cursor.exhausted
+        self.requests = requests
+        self.final = final
+
+
+class CrawlPipeline:
+    """Fetch, transform, database and file stages joined by bounded queues.
+
+    Fetch workers page through jobs and hand raw pages to a single transform
+    thread, which converts them into PaperRecords shared by the database and
+    file sink threads. Full queues block the stage feeding them, so a slow
+    database throttles fetching instead of buffering without bound. The
+    database stage flushes once per page and then advances the job's
+    checkpoint, so checkpoints never run ahead of stored data.
+    """
+
+    def __init__(self, client: SemanticScholarClient, session, seen: Optional[SeenSet] = None,
+                 checkpoints: Optional[CheckpointStore] = None, fetch_workers: Optional[int] = None,
+                 queue_size: Optional[int] = None):
+        self.client = client
+        self.session = session
+        self.seen = seen
+        self.checkpoints = checkpoints or CheckpointStore(session)
+        self.fetch_workers = fetch_workers or CRAWLER_CONFIG['pipeline_fetch_workers']
+        queue_size = queue_size or CRAWLER_CONFIG['pipeline_queue_size']
+        self.jobs_queue: queue.Queue = queue.Queue()
+        self.transform_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.db_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.file_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        for name, stage_queue in (('jobs', self.jobs_queue), ('transform', self.transform_queue),
+                                  ('db', self.db_queue), ('files', self.file_queue)):
+            QUEUE_DEPTH.set_function(stage_queue.qsize, queue=name)
+        self.stage_stats = {
+            'fetch': StageStats('fetch', self.jobs_queue),
+            'transform': StageStats('transform', self.transform_queue),
+            'db': StageStats('db', self.db_queue),
+            'files': StageStats('files', self.file_queue),
+        }
+        self.progress = ProgressLogger(logger)
+        self.batch_writer = PaperBatchWriter(
+            session,
+            batch_size=CRAWLER_CONFIG['db_batch_size'],
+            flush_interval=CRAWLER_CONFIG['db_flush_interval'],
+            seen=seen
+        )
+
+    def stats(self) -> Dict:
+        return {name: stats.to_dict() for name, stats in self.stage_stats.items()}
+
+    def _fetch(self, job: CrawlJob) -> Iterator[PageItem]:
+        counted = self.client.thread_requests_sent()
+        try:
+            for page in job.pages:
+                if job.store_failed:
+                    logger.info(f"Stopped fetching at {job.paginator.cursor} after a failed write")
+                    break
+                sent = self.client.thread_requests_sent()
+                yield PageItem(job, page, sent - counted)
+                counted = sent
+        except SemanticScholarError as e:
+            logger.error(f"Search failed at {job.paginator.cursor}: {e}")
+            job.failed = True
+        except Exception as e:
+            logger.error(f"Unexpected error fetching {job.paginator.cursor}: {e}")
+            job.failed = True
+        # Closes the job: records completion or failure and closes its files
+        yield PageItem(job, [], self.client.thread_requests_sent() - counted, final=True)
+
+    def _transform(self, item: PageItem) -> Iterator[PageItem]:
+        papers = []
+        for paper in item.papers:
+            try:
+                record = PaperRecord.from_api(paper, item.job.topic)
+            except Exception as e:
+                logger.warning(f"Error processing paper: {e}")
+                continue
+            # Only process papers that have at least a title
+            if record.title:
+                papers.append(record)
+        item.papers = papers
+        job = item.job
+        job.processed += len(papers)
+        self.progress.add(len(papers))
+        PAPERS_PROCESSED.inc(len(papers))
+        yield item
+
+    def _store(self, item: PageItem) -> Iterator:
+        job = item.job
+        if job.store_failed:
+            return ()
+        progress = None
+        if job.checkpoint is not None and not (item.final and job.failed):
+            def progress(result):
+                # Committed with the page's papers: the checkpoint never runs ahead of stored data
+                self.checkpoints.advance(
+                    job.checkpoint,
+                    item.offset,
+                    item.token,
+                    papers_stored=result.inserted,
+                    requests=item.requests,
+                    status=STATUS_COMPLETED if item.exhausted else STATUS_IN_PROGRESS
+                )
+        try:
+            for record in item.papers:
+                self.batch_writer.add(record)
+            result = self.batch_writer.flush(progress)
+        except Exception as e:
+            logger.error(f"Error storing batch of papers, failing the job at its last stored page: {e}")
+            job.store_failed = True
+            job.failed = True
+            if job.checkpoint is not None:
+                self.checkpoints.mark(job.checkpoint, STATUS_FAILED)
+            return ()
+        job.inserted += result.inserted
+        job.skipped += result.skipped
+        if job.checkpoint is not None and item.final and job.failed:
+            self.checkpoints.mark(job.checkpoint, STATUS_FAILED)
+        return ()
+
+    def _write_files(self, item: PageItem) -> Iterator:
+        for sink in item.job.sinks:
+            sink.write_many(item.papers)
+        if item.final:
+            for sink in item.job.sinks:
+                sink.close()
+        return ()
+
+    def run(self, jobs: Sequence[CrawlJob]) -> Dict:
+        """Process every job to completion and return per-stage stats"""
+        stages = [
+            Stage(f"fetch-{index}", self._fetch, self.jobs_queue, [self.transform_queue],
+                  self.stage_stats['fetch'])
+            for index in range(self.fetch_workers)
+        ]
+        stages += [
+            Stage('transform', self._transform, self.transform_queue, [self.db_queue, self.file_queue],
+                  self.stage_stats['transform'], producers=self.fetch_workers),
+            Stage('db', self._store, self.db_queue, [], self.stage_stats['db']),
+            Stage('files', self._write_files, self.file_queue, [], self.stage_stats['files']),
+        ]
+        for job in jobs:
+            self.jobs_queue.put(job)
+        for _ in range(self.fetch_workers):
+            self.jobs_queue.put(_DONE)
+        try:
+            for stage in stages:
+                stage.start()
+            for stage in stages:
+                stage.join()
+        finally:
+            for job in jobs:
+                for sink in job.sinks:
+                    sink.close()
+        stats = self.stats()
+        logger.info(f"Pipeline stage stats: {stats}")
+        return stats
@@ -0,0 +1,84 @@
+from typing import List, Optional
+from crawler.api_client import SemanticScholarClient
+from crawler.paginator import SEARCH_RESULT_CAP
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def format_year_filter(year: Optional[int] = None, year_end: Optional[int] = None) -> Optional[str]:
+    """Value of the API's ``year`` parameter: "2001", "2001-2005" or None"""
+    if not year:
+        return None
+    if year_end and year_end != year:
+        return f"{year}-{year_end}"
+    return str(year)
+
+
+class YearShard:
+    """Inclusive year range crawled as one relevance search"""
+
+    def __init__(self, start: int, end: int, total: Optional[int] = None):
+        self.start = start
+        self.end = end
+        self.total = total
+
+    @property
+    def year_filter(self) -> str:
+        return format_year_filter(self.start, self.end)
+
+    def split(self) -> tuple:
+        middle = (self.start + self.end) // 2
+        return YearShard(self.start, middle), YearShard(middle + 1, self.end)
+
+    def __repr__(self):
+        return f"<YearShard({self.year_filter}, total={self.total})>"
+
+
+class ShardPlanner:
+    """Splits a year range into shards whose hits fit under the search result cap.
+
+    The whole range is probed with a one-result search for its total hit
+    count, and ranges above ``cap`` are bisected recursively. A paper has a
+    single year, so the right half's total is the parent's minus the left
+    half's and only the left half needs a probe. Shards without hits are
+    dropped; single years still above the cap are kept and truncated at the
+    cap by the API, which bulk mode avoids.
+    """
+
+    def __init__(self, client: SemanticScholarClient, cap: int = SEARCH_RESULT_CAP,
+                 max_retries: Optional[int] = None):
+        self.client = client
+        self.cap = cap
+        self.max_retries = max_retries
+        self.requests_made = 0
+
+    def probe(self, query: str, shard: YearShard) -> int:
+        """Total hit count of ``query`` within the shard's years"""
+        response = self.client.search(query, offset=0, limit=1, fields=['paperId'],
+                                      year=shard.year_filter, max_retries=self.max_retries)
+        self.requests_made += 1
+        return int(response.get('total') or 0)
+
+    def plan(self, query: str, start: int, end: int) -> List[YearShard]:
+        """Shards covering ``start``..``end`` in year order"""
+        root = YearShard(start, end)
+        root.total = self.probe(query, root)
+        shards = []
+        pending = [root]
+        while pending:
+            shard = pending.pop()
+            if not shard.total:
+                continue
+            if shard.total <= self.cap or shard.start == shard.end:
+                if shard.total > self.cap:
+                    logger.warning(f"{shard} for '{query}' exceeds the {self.cap} result cap and cannot be split further")
+                shards.append(shard)
+                continue
+            left, right = shard.split()
+            left.total = self.probe(query, left)
+            right.total = max(0, shard.total - left.total)
+            # Right first so the left half is visited next and shards come out in year order
+            pending.extend([right, left])
+        logger.info(f"Planned {len(shards)} shards for '{query}' {start}-{end} with {self.requests_made} probes")
+        return shards
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+from config.settings import CRAWLER_CONFIG
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RateLimiter:
+    """Token bucket shared by every thread and event loop issuing API requests.
+
+    Callers reserve a token under a lock and then sleep outside it, so the
+    bucket never blocks an event loop and waiters are served in arrival order.
+    A 429 halves the refill rate (down to ``min_rate``) and pauses the bucket
+    for the server's Retry-After; each success recovers the rate gradually.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: Optional[float] = None,
+                 backoff_factor: float = 0.5, recovery_step: float = 0.05):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate or rate / 16
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request may be sent"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """Slow down after a 429 and pause all callers for ``retry_after`` seconds"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+            # Drop saved-up burst so the resume is paced at the reduced rate
+            self._tokens = min(self._tokens, 0.0)
+        logger.warning(f"Rate limited; pausing {pause:.1f}s and lowering rate to {self.rate:.2f} req/s")
+
+    async def penalize_async(self, retry_after: Optional[float] = None):
+        """``penalize`` for callers on an event loop"""
+        self.penalize(retry_after)
+
+    def record_success(self):
+        """Recover the refill rate towards the configured rate"""
+        if self.rate >= self.base_rate:
+            return
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * self.recovery_step)
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter configured from CRAWLER_CONFIG.
+
+    With ``RATE_BUDGET=shared`` the bucket is kept in the database and split
+    between every crawler process using it.
+    """
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                limiter_class = RateLimiter
+                if CRAWLER_CONFIG['rate_budget'] == 'shared':
+                    # Imported here because the database layer depends on this module
+                    from database.rate_budget import SharedRateBudget
+                    limiter_class = SharedRateBudget
+                _shared_limiter = limiter_class(
+                    rate=CRAWLER_CONFIG['requests_per_second'],
+                    burst=CRAWLER_CONFIG['rate_burst']
+                )
+    return _shared_limiter
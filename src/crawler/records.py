@@ -0,0 +1,82 @@
+from typing import Dict, Optional, Tuple
+from crawler.dedup import title_hash
+
+
+class PaperRecord:
+    """One paper as it moves through the crawl loop.
+
+    Built straight from the raw API JSON and passed as-is to the database
+    writer and every file sink, so a paper is held in memory exactly once
+    between parsing and storage. With ``__slots__`` and tuples an instance
+    takes less than half the memory of the equivalent dict.
+    """
+
+    __slots__ = ('paper_id', 'doi', 'title', 'author_list', 'abstract', 'year', 'citations', 'url',
+                 'fields_of_study', 'topic', '_title_hash')
+
+    def __init__(self, paper_id: Optional[str] = None, doi: Optional[str] = None, title: str = '',
+                 author_list: Tuple[Tuple[Optional[str], str], ...] = (), abstract: str = '',
+                 year: Optional[int] = None, citations: int = 0, url: str = '',
+                 fields_of_study: Tuple[str, ...] = (), topic: Optional[str] = None):
+        self.paper_id = paper_id
+        self.doi = doi
+        self.title = title
+        # (Semantic Scholar author id or None, name) in byline order
+        self.author_list = author_list
+        self.abstract = abstract
+        self.year = year
+        self.citations = citations
+        self.url = url
+        self.fields_of_study = fields_of_study
+        self.topic = topic
+        self._title_hash = None
+
+    @classmethod
+    def from_api(cls, paper: Dict, topic: Optional[str] = None) -> 'PaperRecord':
+        """Build a record from a raw API paper; the title is '' when the API has none"""
+        external_ids = paper.get('externalIds')
+        return cls(
+            paper_id=paper.get('paperId'),
+            doi=external_ids.get('DOI') if external_ids else None,
+            title=paper.get('title') or '',
+            author_list=tuple(
+                (author.get('authorId'), author['name'])
+                for author in paper.get('authors') or () if author.get('name')
+            ),
+            abstract=paper.get('abstract') or '',
+            year=paper.get('year'),
+            citations=paper.get('citationCount') or 0,
+            url=paper.get('url') or '',
+            fields_of_study=tuple(paper.get('fieldsOfStudy') or ()),
+            topic=topic
+        )
+
+    @property
+    def authors(self) -> str:
+        """Comma-separated author names, as stored in papers.authors"""
+        return ', '.join(name for _, name in self.author_list)
+
+    @property
+    def title_hash(self) -> int:
+        if self._title_hash is None:
+            self._title_hash = title_hash(self.title)
+        return self._title_hash
+
+    def to_dict(self) -> Dict:
+        """JSON-ready form, as written to JSONL files"""
+        return {
+            'paper_id': self.paper_id,
+            'doi': self.doi,
+            'title': self.title,
+            'authors': self.authors,
+            'author_list': [{'author_id': author_id, 'name': name} for author_id, name in self.author_list],
+            'abstract': self.abstract,
+            'year': self.year,
+            'citations': self.citations,
+            'url': self.url,
+            'fields_of_study': list(self.fields_of_study),
+            'topic': self.topic,
+        }
+
+    def __repr__(self):
+        return f"<PaperRecord(title='{self.title}', year={self.year})>"
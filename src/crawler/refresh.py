@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import Float, Integer, bindparam, case, column, func, or_, select, update, values
+from sqlalchemy.dialects import postgresql, sqlite
+from config.settings import CRAWLER_CONFIG
+from crawler.api_client import SemanticScholarClient
+from database.models import Paper, PaperRefresh
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+REFRESH_FIELDS = ['paperId', 'citationCount']
+
+_INSERT_BY_DIALECT = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+class RefreshResult:
+    """Counts of one or more refresh batches"""
+
+    def __init__(self, checked: int = 0, changed: int = 0, missing: int = 0):
+        self.checked = checked
+        self.changed = changed
+        self.missing = missing
+
+    def __add__(self, other: 'RefreshResult') -> 'RefreshResult':
+        return RefreshResult(self.checked + other.checked, self.changed + other.changed,
+                             self.missing + other.missing)
+
+    def __repr__(self):
+        return f"<RefreshResult(checked={self.checked}, changed={self.changed}, missing={self.missing})>"
+
+
+class CitationRefresher:
+    """Re-fetches citation counts of stored papers, most urgent first.
+
+    Papers not checked for ``min_age_days`` are due; among those the ones
+    whose citations grew fastest when they last changed go first, then the
+    longest unchecked. A paper whose last check found no change has no
+    priority. Each batch is fetched with one POST /paper/batch and written
+    with a single ``UPDATE ... FROM (VALUES ...)`` that only touches papers
+    whose count changed. When each paper was checked goes to the narrow
+    paper_refresh table, so unchanged papers are never rewritten.
+    """
+
+    def __init__(self, session, client: Optional[SemanticScholarClient] = None,
+                 batch_size: Optional[int] = None, min_age_days: Optional[float] = None):
+        self.session = session
+        # No response cache: a cached count is exactly what a refresh must avoid
+        self.client = client or SemanticScholarClient()
+        self.batch_size = batch_size or CRAWLER_CONFIG['refresh_batch_size']
+        self.min_age_days = min_age_days if min_age_days is not None else CRAWLER_CONFIG['refresh_min_age_days']
+
+    def due_cutoff(self, now: datetime) -> datetime:
+        """Papers last refreshed before this time are due"""
+        return now - timedelta(days=self.min_age_days)
+
+    def select_due(self, limit: int, cutoff: datetime) -> List:
+        """Rows (id, paper_id, citations, refreshed_at, created_at) of the most urgent due papers"""
+        # Papers refreshed before paper_refresh existed fall back to refreshed_at
+        checked_at = func.coalesce(PaperRefresh.checked_at, Paper.refreshed_at)
+        velocity = case((PaperRefresh.checked_at > Paper.refreshed_at, 0.0), else_=Paper.citation_velocity)
+        stmt = (
+            select(Paper.id, Paper.paper_id, Paper.citations, Paper.refreshed_at, Paper.created_at)
+            .outerjoin(PaperRefresh, PaperRefresh.paper_id == Paper.id)
+            .where(
+                Paper.paper_id.isnot(None),
+                or_(checked_at.is_(None), checked_at < cutoff)
+            )
+            .order_by(velocity.desc(), checked_at.asc().nullsfirst())
+            .limit(limit)
+        )
+        return self.session.execute(stmt).all()
+
+    def _update_changed(self, changes: List[Dict], now: datetime) -> int:
+        """Write new counts in one statement; returns rows actually updated"""
+        if not changes:
+            return 0
+        if self.session.get_bind().dialect.name == 'postgresql':
+            rows = values(
+                column('id', Integer), column('citations', Integer), column('citation_velocity', Float),
+                name='changes'
+            ).data([(change['id'], change['citations'], change['citation_velocity']) for change in changes])
+            stmt = (
+                update(Paper)
+                .where(Paper.id == rows.c.id, Paper.citations.is_distinct_from(rows.c.citations))
+                .values(citations=rows.c.citations, citation_velocity=rows.c.citation_velocity,
+                        updated_at=now, refreshed_at=now)
+            )
+            return self.session.execute(stmt).rowcount
+        # SQLite cannot name the columns of a VALUES list, so fall back to executemany
+        stmt = (
+            update(Paper)
+            .where(Paper.id == bindparam('change_id'),
+                   Paper.citations.is_distinct_from(bindparam('change_citations')))
+            .values(citations=bindparam('change_citations'), citation_velocity=bindparam('change_velocity'),
+                    updated_at=now, refreshed_at=now)
+        )
+        params = [
+            {'change_id': change['id'], 'change_citations': change['citations'],
+             'change_velocity': change['citation_velocity']}
+            for change in changes
+        ]
+        return self.session.connection().execute(stmt, params).rowcount
+
+    def _log_checked(self, ids: List[int], now: datetime):
+        """Record in paper_refresh that the papers were checked at ``now``"""
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in _INSERT_BY_DIALECT:
+            raise RuntimeError(f"Refresh log upsert is not supported for dialect '{dialect}'")
+        stmt = _INSERT_BY_DIALECT[dialect](PaperRefresh).values(
+            [{'paper_id': paper_id, 'checked_at': now} for paper_id in ids]
+        )
+        self.session.execute(stmt.on_conflict_do_update(index_elements=[PaperRefresh.paper_id],
+                                                        set_={'checked_at': stmt.excluded.checked_at}))
+
+    def refresh_batch(self, limit: Optional[int] = None, cutoff: Optional[datetime] = None) -> Optional[RefreshResult]:
+        """Refresh the next batch of papers due at ``cutoff``; returns None when nothing is due"""
+        now = datetime.utcnow()
+        due = self.select_due(limit or self.batch_size, cutoff or self.due_cutoff(now))
+        if not due:
+            return None
+        fetched = {
+            paper['paperId']: paper.get('citationCount')
+            for paper in self.client.get_papers([row.paper_id for row in due], fields=REFRESH_FIELDS)
+        }
+        changes = []
+        for row in due:
+            citations = fetched.get(row.paper_id)
+            if citations is None or citations == row.citations:
+                continue
+            since = row.refreshed_at or row.created_at or now
+            days = max((now - since).total_seconds() / 86400, 1 / 24)
+            changes.append({
+                'id': row.id,
+                'citations': citations,
+                'citation_velocity': max(0.0, (citations - (row.citations or 0)) / days),
+            })
+        try:
+            changed = self._update_changed(changes, now)
+            self._log_checked([row.id for row in due], now)
+            self.session.commit()
+        except Exception as e:
+            logger.error(f"Error applying refreshed citations: {e}")
+            self.session.rollback()
+            raise
+        result = RefreshResult(checked=len(due), changed=changed, missing=len(due) - len(fetched))
+        logger.info(f"Refreshed {result.checked} papers: {result.changed} changed, {result.missing} not found")
+        return result
+
+    def run(self, max_papers: Optional[int] = None) -> RefreshResult:
+        """Refresh due papers batch by batch until none are due or ``max_papers`` were checked"""
+        # Fixed for the whole run: with min_age_days=0 a moving cutoff would make
+        # every paper refreshed by this run due again, and the run would never end
+        cutoff = self.due_cutoff(datetime.utcnow())
+        total = RefreshResult()
+        while max_papers is None or total.checked < max_papers:
+            limit = self.batch_size if max_papers is None else min(self.batch_size, max_papers - total.checked)
+            result = self.refresh_batch(limit, cutoff)
+            if result is None:
+                break
+            total = total + result
+        logger.info(f"Citation refresh finished: {total}")
+        return total
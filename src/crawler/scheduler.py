@@ -0,0 +1,205 @@
+import heapq
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func
+from config.settings import CRAWLER_CONFIG
+from crawler.scholar_crawler import ScholarCrawler, build_search_query
+from database.checkpoints import CheckpointStore, STATUS_COMPLETED, STATUS_IN_PROGRESS
+from database.models import CrawlState
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Weight, in requests, of the topic prior when smoothing a unit's own yield
+PRIOR_REQUESTS = 5
+
+
+def smoothed_yield(stored: int, requests: int, prior: float) -> float:
+    """New papers per request, shrunk toward ``prior`` while a unit has few requests"""
+    return (stored + prior * PRIOR_REQUESTS) / (requests + PRIOR_REQUESTS)
+
+
+class ScheduledUnit:
+    """One topic/year unit with the crawl_state counters its priority is computed from"""
+
+    def __init__(self, topic: str, year: int, stored: int = 0, requests: int = 0,
+                 status: Optional[str] = None, updated_at: Optional[datetime] = None):
+        self.topic = topic
+        self.year = year
+        self.query = build_search_query(topic, year)
+        self.stored = stored
+        self.requests = requests
+        self.status = status
+        self.updated_at = updated_at
+        # A completed unit past stale_days is reset before its first slice
+        self.recrawl = False
+        self.score = 0.0
+
+    def __repr__(self):
+        return (f"<ScheduledUnit(topic='{self.topic}', year={self.year}, score={self.score:.2f}, "
+                f"stored={self.stored}, requests={self.requests})>")
+
+
+class CrawlScheduler:
+    """Crawls topic/year units best-first under a request budget.
+
+    A unit's priority is its expected number of newly stored papers per API
+    request. crawl_state only counts papers that survived deduplication, so
+    ``papers_stored / requests`` falls as a unit's results overlap what is
+    already in the database. Units with little history borrow the yield of
+    their topic, or a full page per request when nothing is known, so
+    untried units get a chance early. Completed units come back once they
+    are ``stale_days`` old, discounted by age, and are crawled again from
+    the first page.
+
+    Units are run off a heap in slices of ``slice_requests`` requests. After
+    each slice the unit's counters are re-read, and an entry whose score
+    dropped is pushed back instead of run, so budget always goes to the best
+    unit known so far. No topic spends more than ``topic_quota`` requests
+    and the run stops once ``request_budget`` is used up.
+    """
+
+    def __init__(self, crawler: ScholarCrawler, topics: Iterable[str], years: Iterable[int],
+                 request_budget: Optional[int] = None, topic_quota: Optional[int] = None,
+                 slice_requests: Optional[int] = None, stale_days: Optional[float] = None):
+        self.crawler = crawler
+        self.session = crawler.session
+        self.checkpoints = CheckpointStore(self.session)
+        self.units = [ScheduledUnit(topic, year) for year in years for topic in topics]
+        self.request_budget = request_budget or CRAWLER_CONFIG['scheduler_request_budget']
+        self.topic_quota = topic_quota or CRAWLER_CONFIG['scheduler_topic_quota']
+        self.slice_requests = slice_requests or CRAWLER_CONFIG['scheduler_slice_requests']
+        self.stale_days = stale_days if stale_days is not None else CRAWLER_CONFIG['scheduler_stale_days']
+        self.page_size = CRAWLER_CONFIG['page_size']
+        # topic -> [papers stored, requests] over every relevance-search unit of the topic
+        self.topic_totals: Dict[str, List[int]] = {}
+        self.requests_used = 0
+        self.topic_requests: Dict[str, int] = {}
+        self.papers_processed = 0
+        self.papers_stored = 0
+
+    def _state(self, unit: ScheduledUnit) -> Optional[CrawlState]:
+        return self.session.query(CrawlState).filter_by(query=unit.query, year=unit.year).first()
+
+    def load_stats(self):
+        """Read unit counters and per-topic totals from crawl_state"""
+        topics = {unit.topic for unit in self.units}
+        rows = (
+            self.session.query(CrawlState.topic, func.sum(CrawlState.papers_stored), func.sum(CrawlState.requests))
+            .filter(CrawlState.topic.in_(topics), ~CrawlState.query.like('bulk:%'))
+            .group_by(CrawlState.topic)
+        )
+        self.topic_totals = {topic: [int(stored or 0), int(requests or 0)] for topic, stored, requests in rows}
+        states = {
+            (state.query, state.year): state
+            for state in self.session.query(CrawlState).filter(CrawlState.query.in_([unit.query for unit in self.units]))
+        }
+        for unit in self.units:
+            state = states.get((unit.query, unit.year))
+            if state is not None:
+                unit.stored, unit.requests = state.papers_stored, state.requests
+                unit.status, unit.updated_at = state.status, state.updated_at
+        self.session.commit()
+
+    def prior(self, topic: str) -> float:
+        """Expected new papers per request of a unit with no history of its own"""
+        stored, requests = self.topic_totals.get(topic, (0, 0))
+        if requests:
+            return stored / requests
+        totals = [sum(column) for column in zip(*self.topic_totals.values())] or [0, 0]
+        return totals[0] / totals[1] if totals[1] else float(self.page_size)
+
+    def score(self, unit: ScheduledUnit, now: Optional[datetime] = None) -> float:
+        """Expected new papers per request of the unit's next slice; 0 when it should not run"""
+        expected = smoothed_yield(unit.stored, unit.requests, self.prior(unit.topic))
+        if unit.status != STATUS_COMPLETED or unit.recrawl:
+            return expected
+        age_days = ((now or datetime.utcnow()) - (unit.updated_at or datetime.min)).total_seconds() / 86400
+        if not self.stale_days or age_days < self.stale_days:
+            return 0.0
+        # Older results are more likely to have gained papers since
+        return expected * age_days / (age_days + self.stale_days)
+
+    def plan(self) -> List[ScheduledUnit]:
+        """Runnable units, best first"""
+        now = datetime.utcnow()
+        for unit in self.units:
+            unit.score = self.score(unit, now)
+        return sorted((unit for unit in self.units if unit.score > 0), key=lambda unit: unit.score, reverse=True)
+
+    def _grant(self, unit: ScheduledUnit) -> int:
+        """Requests the unit may spend on its next slice"""
+        grant = min(self.slice_requests, self.request_budget - self.requests_used)
+        if self.topic_quota:
+            grant = min(grant, self.topic_quota - self.topic_requests.get(unit.topic, 0))
+        return grant
+
+    def _run_slice(self, unit: ScheduledUnit, grant: int) -> int:
+        """Crawl up to ``grant`` pages of the unit; returns the requests it made"""
+        if unit.status == STATUS_COMPLETED and not unit.recrawl:
+            state = self._state(unit)
+            logger.info(f"Recrawling stale unit '{unit.query}' last completed {unit.updated_at}")
+            self.checkpoints.reset(state)
+            self._count(unit, -unit.stored, -unit.requests)
+            unit.stored = unit.requests = 0
+            unit.recrawl = True
+        logger.info(f"Crawling '{unit.query}' for up to {grant} requests "
+                    f"(expected {unit.score:.1f} new papers per request)")
+        self.papers_processed += self.crawler.crawl_math_papers(
+            topic=unit.topic, year=unit.year, max_results=grant * self.page_size
+        )
+        state = self._state(unit)
+        if state is None:
+            return 0
+        stored, requests = state.papers_stored - unit.stored, state.requests - unit.requests
+        unit.stored, unit.requests, unit.status = state.papers_stored, state.requests, state.status
+        self.session.commit()
+        self._count(unit, stored, requests)
+        self.papers_stored += stored
+        return requests
+
+    def _count(self, unit: ScheduledUnit, stored: int, requests: int):
+        totals = self.topic_totals.setdefault(unit.topic, [0, 0])
+        totals[0] += stored
+        totals[1] += requests
+
+    def run(self) -> Dict:
+        """Spend the request budget on the best units; returns run totals"""
+        self.load_stats()
+        heap = [(-unit.score, index, unit) for index, unit in enumerate(self.plan())]
+        heapq.heapify(heap)
+        logger.info(f"Scheduling {len(heap)} of {len(self.units)} units with a budget of {self.request_budget} requests")
+        while heap and self.requests_used < self.request_budget:
+            _, index, unit = heapq.heappop(heap)
+            unit.score = self.score(unit)
+            if unit.score <= 0:
+                continue
+            if heap and unit.score < -heap[0][0]:
+                # Its yield dropped since it was queued; let the better unit go first
+                heapq.heappush(heap, (-unit.score, index, unit))
+                continue
+            grant = self._grant(unit)
+            if grant <= 0:
+                logger.info(f"Topic {unit.topic} used its quota of {self.topic_quota} requests")
+                continue
+            try:
+                used = self._run_slice(unit, grant)
+            except Exception as e:
+                logger.error(f"Error crawling '{unit.query}', dropping it from this run: {e}")
+                self.session.rollback()
+                continue
+            self.requests_used += used
+            self.topic_requests[unit.topic] = self.topic_requests.get(unit.topic, 0) + used
+            if used == 0:
+                logger.warning(f"'{unit.query}' made no requests, dropping it from this run")
+            elif unit.status == STATUS_IN_PROGRESS:
+                heapq.heappush(heap, (-self.score(unit), index, unit))
+        stats = {
+            'requests': self.requests_used,
+            'papers_processed': self.papers_processed,
+            'papers_stored': self.papers_stored,
+            'papers_per_request': round(self.papers_stored / self.requests_used, 2) if self.requests_used else 0.0,
+            'requests_by_topic': dict(self.topic_requests),
+        }
+        logger.info(f"Scheduled crawl finished: {stats}")
+        return stats
@@ -1,26 +1,50 @@
-import time
-import random
-import json
-import csv
 from datetime import datetime
 from pathlib import Path
-from semanticscholar import SemanticScholar
-from typing import List, Dict, Optional
-from database.session import get_session, init_db
-from database.models import Paper, Base
+from typing import Dict, Iterator, List, Optional, Union
+from database.session import get_session, require_schema
+from database.models import CrawlState
+from database.checkpoints import CheckpointStore, STATUS_COMPLETED
 from config.settings import CRAWLER_CONFIG, MATH_TOPICS
+from crawler.api_client import SemanticScholarClient
+from crawler.cache import get_response_cache
+from crawler.dedup import SeenSet
+from crawler.paginator import SearchPaginator, BulkSearchPaginator, SearchCursor
+from crawler.pipeline import CrawlPipeline, CrawlJob
+from crawler.planner import ShardPlanner, YearShard, format_year_filter
+from crawler.records import PaperRecord
+from crawler.sinks import open_sinks
 from crawler.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+def build_search_text(topic: Optional[str] = None, custom_query: Optional[str] = None) -> str:
+    """Text sent to the search endpoints"""
+    return custom_query or topic or "mathematics"
+
+def build_search_query(topic: Optional[str] = None, year: Optional[Union[int, str]] = None, custom_query: Optional[str] = None) -> str:
+    """Key of a crawl unit in crawl_state: the search text plus its year filter
+
+    The year itself is sent as the API's ``year`` parameter, not as search text.
+    """
+    query_parts = [build_search_text(topic, custom_query)]
+        
+    if year:
+        query_parts.append(f"year:{year}")
+        
+    return " ".join(query_parts)
+
 class ScholarCrawler:
-    def __init__(self):
+    def __init__(self, cache_mode: Optional[str] = None):
         logger.info("Initializing crawler and database connection...")
         try:
-            # Initialize database tables
-            init_db()
+            # Tables are created by init_db.py, never on the crawl path
+            require_schema()
             self.session = get_session()
-            self.sch = SemanticScholar()
+            self.checkpoints = CheckpointStore(self.session)
+            # Known papers are dropped before they reach the database
+            self.seen = SeenSet()
+            self.seen.warm(self.session)
+            self.client = SemanticScholarClient(cache=get_response_cache(cache_mode))
             # Create data directory if it doesn't exist
             self.data_dir = Path(__file__).parent / 'data'
             self.data_dir.mkdir(exist_ok=True)
@@ -30,270 +54,119 @@ class ScholarCrawler:
             raise
 
     def __del__(self):
-        """Clean up the session when the crawler is destroyed"""
+        """Clean up the session and API client when the crawler is destroyed"""
         if hasattr(self, 'session'):
-            logger.info("Closing database session")
+            # May run during interpreter shutdown, after the log listener has stopped
+            logger.debug("Closing database session")
             try:
                 self.session.close()
             except Exception as e:
                 logger.error(f"Error closing session: {e}")
+        if hasattr(self, 'client'):
+            try:
+                self.client.close()
+            except Exception as e:
+                logger.error(f"Error closing API client: {e}")
 
-    def _random_delay(self):
-        """Add a random delay between requests"""
-        delay = CRAWLER_CONFIG['delay_between_requests'] + random.uniform(1, 3)
-        logger.debug(f"Waiting {delay:.2f} seconds before next request")
-        time.sleep(delay)
-
-    def _build_search_query(self, topic: Optional[str] = None, year: Optional[int] = None, custom_query: Optional[str] = None) -> str:
+    def _build_search_query(self, topic: Optional[str] = None, year: Optional[Union[int, str]] = None, custom_query: Optional[str] = None) -> str:
         """Build a search query based on filters"""
-        query_parts = []
-        
-        if custom_query:
-            query_parts.append(custom_query)
-        elif topic:
-            query_parts.append(topic)
-        else:
-            query_parts.append("mathematics")
-            
-        if year:
-            query_parts.append(f"year:{year}")
-            
-        return " ".join(query_parts)
+        return build_search_query(topic, year, custom_query)
 
-    def search_papers(self, topic: Optional[str] = None, year: Optional[int] = None, year_end: Optional[int] = None, custom_query: Optional[str] = None, max_results: Optional[int] = None, max_retries: int = 3) -> List[Dict]:
-        """Search for papers using Semantic Scholar API"""
-        query = self._build_search_query(topic, year, custom_query)
-        logger.info(f"Searching for papers with query: '{query}'")
-        
-        processed_papers = []
-        total_processed = 0
-        limit = 100  # Maximum allowed by Semantic Scholar API per request
-        
-        # Create CSV file at the start
+    def _output_stem(self, prefix: str, *parts) -> Path:
+        """Timestamped output path without extension, e.g. papers_Algebra_2001_<ts>"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        topic_str = f"_{topic}" if topic else ""
-        year_str = f"_{year}" if year else ""
-        year_end_str = f"_{year_end}" if year_end else ""
-        csv_filename = self.data_dir / f"papers{topic_str}{year_str}{year_end_str}_{timestamp}.csv"
-        
-        # Define CSV headers
-        fieldnames = ['title', 'authors', 'abstract', 'year', 'citations', 'url', 'fields_of_study']
-        
-        # Create CSV file with headers
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+        name = "_".join([prefix] + [str(part) for part in parts if part] + [timestamp])
+        return self.data_dir / name
+
+    def search_papers(self, topic: Optional[str] = None, year: Optional[int] = None, year_end: Optional[int] = None, custom_query: Optional[str] = None, max_results: Optional[int] = None, max_retries: int = 3, cursor: Optional[SearchCursor] = None, checkpoint: Optional[CrawlState] = None) -> int:
+        """Search for papers using Semantic Scholar API and return how many were processed
+
+        Papers are streamed to the database and to this run's output files as
+        they arrive instead of being kept in memory. Pass a saved ``cursor`` to
+        resume a previous search; it is advanced in place as pages are consumed.
+        With a ``checkpoint`` the cursor is persisted after every stored page.
+        """
+        query = build_search_text(topic, custom_query)
+        year_filter = format_year_filter(year, year_end)
+        logger.info(f"Searching for papers with query: '{query}' (year: {year_filter or 'any'})")
         
-        # First, get total count of papers
-        try:
-            # Initial search to get total count
-            initial_results = self.sch.search_paper(
-                query,
-                limit=1,  # Just get one result to check if there are any papers
-                fields=['title', 'authors', 'abstract', 'year', 
-                       'citationCount', 'url', 'fieldsOfStudy']
-            )
-            
-            if not initial_results:
-                logger.info("No papers found for the query")
-                return processed_papers
-                
-            # Now get all papers in batches
-            while True:
-                for attempt in range(max_retries):
-                    try:
-                        # Search papers with current limit
-                        papers = self.sch.search_paper(
-                            query, 
-                            limit=limit,
-                            fields=['title', 'authors', 'abstract', 'year', 
-                                   'citationCount', 'url', 'fieldsOfStudy']
-                        )
-                        
-                        if not papers:
-                            logger.info("No more papers found")
-                            return processed_papers
-                        
-                        for paper in papers:
-                            try:
-                                # Extract author names from the paper object
-                                authors = ', '.join([author.name for author in paper.authors]) if paper.authors else ''
-                                
-                                # Get fields of study
-                                fields = paper.fieldsOfStudy if hasattr(paper, 'fieldsOfStudy') else []
-                                
-                                paper_data = {
-                                    'title': paper.title or '',
-                                    'authors': authors,
-                                    'abstract': paper.abstract or '',
-                                    'year': paper.year,
-                                    'citations': paper.citationCount or 0,
-                                    'url': paper.url or '',
-                                    'fields_of_study': fields
-                                }
-                                
-                                # Only process papers that have at least a title
-                                if paper_data['title']:
-                                    # Store in database
-                                    if self.store_paper(paper_data):
-                                        logger.info(f"Stored in database: {paper_data['title']}")
-                                    
-                                    # Append to CSV
-                                    try:
-                                        with open(csv_filename, 'a', newline='', encoding='utf-8') as csvfile:
-                                            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                                            paper_row = {
-                                                'title': paper_data['title'],
-                                                'authors': paper_data['authors'],
-                                                'abstract': paper_data['abstract'].replace('\n', ' ').replace('\r', ' '),
-                                                'year': paper_data['year'],
-                                                'citations': paper_data['citations'],
-                                                'url': paper_data['url'],
-                                                'fields_of_study': ','.join(paper_data['fields_of_study'])
-                                            }
-                                            writer.writerow(paper_row)
-                                        logger.info(f"Appended to CSV: {paper_data['title']}")
-                                    except Exception as e:
-                                        logger.error(f"Error writing to CSV: {e}")
-                                    
-                                    processed_papers.append(paper_data)
-                                    total_processed += 1
-                                    
-                                    # Log progress every 5 papers
-                                    if total_processed % 5 == 0:
-                                        logger.info(f"Progress: {total_processed} papers processed")
-                                
-                                # Add small delay between processing papers
-                                self._random_delay()
-                            except Exception as e:
-                                logger.warning(f"Error processing paper: {e}")
-                                continue
-                        
-                        # If we got fewer papers than the limit, we've reached the end
-                        if len(papers) < limit:
-                            logger.info(f"Reached end of results. Total papers processed: {total_processed}")
-                            return processed_papers
-                        
-                        # If max_results is set and we've reached it, stop
-                        if max_results and total_processed >= max_results:
-                            logger.info(f"Reached maximum number of papers to process ({max_results})")
-                            return processed_papers[:max_results]
-                        
-                        break  # Break retry loop on success
-                        
-                    except Exception as e:
-                        if attempt < max_retries - 1:
-                            logger.warning(f"Attempt {attempt + 1} failed: {e}. Retrying...")
-                            self._random_delay()
-                        else:
-                            logger.error(f"All attempts failed: {e}")
-                            return processed_papers
-                
-                # Add delay between batches
-                self._random_delay()
-                
-                # Increase limit for next batch
-                limit = min(limit * 2, 100)  # Double the limit but don't exceed 100
-                
-        except Exception as e:
-            logger.error(f"Error in initial search: {e}")
-            return processed_papers
+        paginator = SearchPaginator(
+            self.client,
+            query,
+            page_size=CRAWLER_CONFIG['page_size'],
+            max_results=max_results,
+            cursor=cursor,
+            max_retries=max_retries,
+            year=year_filter
+        )
         
-        return processed_papers
+        return self._ingest(paginator, paginator.pages(), checkpoint, self._output_stem("papers", topic, year, year_end), topic)
 
-    def store_paper(self, paper_data: Dict) -> bool:
-        """Store a single paper in the database"""
-        try:
-            logger.info(f"Attempting to store paper: {paper_data['title']}")
-            
-            # Check if paper already exists
-            existing_paper = self.session.query(Paper).filter_by(title=paper_data['title']).first()
-            if existing_paper:
-                logger.info(f"Paper already exists: {paper_data['title']}")
-                return True
+    def _hydrate(self, pages: Iterator[List[Dict]]) -> Iterator[List[Dict]]:
+        """Replace pages of bulk search hits with full records of the papers not stored yet"""
+        for page in pages:
+            new_ids = [
+                paper['paperId'] for paper in page
+                if paper.get('paperId') and not self.seen.contains(PaperRecord.from_api(paper))
+            ]
+            logger.info(f"Hydrating {len(new_ids)} of {len(page)} bulk search hits")
+            yield self.client.get_papers(new_ids) if new_ids else []
 
-            # Create new paper
-            paper = Paper(
-                title=paper_data['title'],
-                authors=paper_data['authors'],
-                abstract=paper_data['abstract'],
-                year=paper_data['year'],
-                citations=paper_data['citations'],
-                url=paper_data['url']
-            )
-            
-            self.session.add(paper)
-            try:
-                self.session.commit()
-                logger.info(f"Successfully committed paper to database: {paper_data['title']}")
-                return True
-            except Exception as e:
-                logger.error(f"Error committing paper {paper_data['title']}: {e}")
-                self.session.rollback()
-                return False
-        except Exception as e:
-            logger.error(f"Error storing paper {paper_data['title']}: {e}")
-            self.session.rollback()
-            return False
+    def _ingest(self, paginator: SearchPaginator, pages: Iterator[List[Dict]], checkpoint: Optional[CrawlState], output_stem: Path, topic: Optional[str] = None) -> int:
+        """Store and export every page through the crawl pipeline; returns papers processed"""
+        # One buffered handle per output format for the whole run
+        sinks = open_sinks(
+            output_stem,
+            CRAWLER_CONFIG['output_formats'],
+            CRAWLER_CONFIG['output_compression']
+        )
+        job = CrawlJob(paginator, pages, checkpoint, sinks, topic=topic)
+        
+        # Fetching, transforming, storing and exporting overlap on separate threads
+        pipeline = CrawlPipeline(self.client, self.session, seen=self.seen, checkpoints=self.checkpoints)
+        pipeline.run([job])
+        
+        logger.info(f"Stored {job.inserted} new papers, skipped {job.skipped} existing")
+        if job.failed:
+            logger.info(f"Search failed after {job.processed} papers")
+        elif paginator.cursor.exhausted:
+            logger.info(f"Reached end of results. Total papers processed: {job.processed}")
+        else:
+            logger.info(f"Stopped at {paginator.cursor} after {job.processed} papers")
+        
+        return job.processed
 
-    def save_crawled_data(self, papers: List[Dict], stored_count: int):
-        """Save crawled data to a JSON file"""
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = self.data_dir / f"crawled_papers_{timestamp}.json"
-            
-            data = {
-                "timestamp": timestamp,
-                "total_papers_found": len(papers),
-                "total_papers_stored": stored_count,
-                "papers": papers
-            }
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"Saved crawled data to {filename}")
-            return filename
-        except Exception as e:
-            logger.error(f"Error saving crawled data: {e}")
+    def _load_checkpoint(self, query: str, topic: Optional[str], year: Optional[int], resume: bool) -> Optional[CrawlState]:
+        """Checkpoint to continue from, or None when the unit is already complete"""
+        checkpoint = self.checkpoints.load(query, topic, year)
+        if not resume:
+            self.checkpoints.reset(checkpoint)
+        elif checkpoint.status == STATUS_COMPLETED:
+            logger.info(f"Skipping completed unit '{query}' ({checkpoint.papers_stored} papers stored)")
             return None
+        elif checkpoint.offset or checkpoint.token:
+            logger.info(f"Resuming '{query}' from offset {checkpoint.offset}")
+        return checkpoint
 
-    def save_to_csv(self, papers: List[Dict], topic: Optional[str] = None, year: Optional[int] = None):
-        """Save papers to a CSV file"""
-        try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            topic_str = f"_{topic}" if topic else ""
-            year_str = f"_{year}" if year else ""
-            filename = self.data_dir / f"papers{topic_str}{year_str}_{timestamp}.csv"
-            
-            # Define CSV headers
-            fieldnames = ['title', 'authors', 'abstract', 'year', 'citations', 'url', 'fields_of_study']
-            
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for paper in papers:
-                    # Clean the data for CSV writing
-                    paper_row = {
-                        'title': paper['title'],
-                        'authors': paper['authors'],
-                        'abstract': paper['abstract'].replace('\n', ' ').replace('\r', ' '),
-                        'year': paper['year'],
-                        'citations': paper['citations'],
-                        'url': paper['url'],
-                        'fields_of_study': ','.join(paper.get('fields_of_study', []))
-                    }
-                    writer.writerow(paper_row)
-            
-            logger.info(f"Successfully saved {len(papers)} papers to CSV: {filename}")
-            return filename
-        except Exception as e:
-            logger.error(f"Error saving papers to CSV: {e}")
-            return None
+    def _crawl_shard(self, topic: Optional[str], year: Optional[int], year_end: Optional[int], custom_query: Optional[str], max_results: Optional[int], resume: bool) -> int:
+        """Crawl one year range as a checkpointed unit"""
+        query = self._build_search_query(topic, format_year_filter(year, year_end), custom_query)
+        checkpoint = self._load_checkpoint(query, topic, year, resume)
+        if checkpoint is None:
+            return 0
+        cursor = SearchCursor(offset=checkpoint.offset, token=checkpoint.token)
+        
+        return self.search_papers(topic=topic, year=year, year_end=year_end, custom_query=custom_query, max_results=max_results, cursor=cursor, checkpoint=checkpoint)
 
-    def crawl_math_papers(self, topic: Optional[str] = None, year: Optional[int] = None, year_end: Optional[int] = None, custom_query: Optional[str] = None, max_results: Optional[int] = None):
-        """Main function to crawl math papers with filters"""
+    def crawl_math_papers(self, topic: Optional[str] = None, year: Optional[int] = None, year_end: Optional[int] = None, custom_query: Optional[str] = None, max_results: Optional[int] = None, resume: bool = True):
+        """Main function to crawl math papers with filters
+
+        A ``year``..``year_end`` range is split by the ShardPlanner into year
+        shards small enough for the relevance search cap, each crawled as its
+        own unit. With ``resume`` the units' crawl_state checkpoints are
+        honoured: completed units are skipped and partial ones continue from
+        their stored offset. Otherwise they are crawled again from the start.
+        """
         try:
             logger.info("Starting paper crawl...")
             
@@ -303,26 +176,81 @@ class ScholarCrawler:
                 topic = None
                 
             # Validate year if provided
+            year_range = CRAWLER_CONFIG['year_range']
             if year:
-                year_range = CRAWLER_CONFIG['year_range']
                 if not (year_range['start'] <= year <= year_range['end']):
                     logger.warning(f"Year {year} out of range. Using default year range.")
                     year = None
+            if year_end:
+                if not year or not (year <= year_end <= year_range['end']):
+                    logger.warning(f"End year {year_end} out of range. Crawling a single year.")
+                    year_end = None
             
-            papers = self.search_papers(topic=topic, year=year, year_end=year_end, custom_query=custom_query, max_results=max_results)
+            if year and year_end and year_end > year:
+                planner = ShardPlanner(self.client, max_retries=CRAWLER_CONFIG['max_retries'])
+                shards = planner.plan(build_search_text(topic, custom_query), year, year_end)
+            else:
+                shards = [YearShard(year, year)]
             
-            # Save crawled data to JSON as backup
-            self.save_crawled_data(papers, len(papers))
+            processed = 0
+            for shard in shards:
+                remaining = max_results - processed if max_results else None
+                if remaining is not None and remaining <= 0:
+                    break
+                processed += self._crawl_shard(topic, shard.start, shard.end, custom_query, remaining, resume)
             
-            logger.info(f"Paper crawl completed successfully. Processed {len(papers)} papers.")
-            return len(papers)
+            logger.info(f"Paper crawl completed successfully. Processed {processed} papers.")
+            return processed
         except Exception as e:
             logger.error(f"Error during paper crawl: {e}")
             raise
         finally:
-            # Ensure session is closed
+            # Ensure session and client are closed; both reopen if the crawler is used again
             logger.info("Closing database session")
             try:
                 self.session.close()
+                self.client.close()
             except Exception as e:
-                logger.error(f"Error closing session: {e}")
\ No newline at end of file
+                logger.error(f"Error closing session: {e}")
+
+    def bulk_crawl(self, topic: Optional[str] = None, year: Optional[int] = None, year_end: Optional[int] = None, custom_query: Optional[str] = None, max_results: Optional[int] = None, resume: bool = True) -> int:
+        """Sweep a topic with the bulk search endpoint instead of relevance search
+
+        Bulk search pages through up to 1000 ids per request with continuation
+        tokens and has no result cap. Only ids missing from the dedup index are
+        hydrated, 500 at a time, through POST /paper/batch. Papers that are
+        already stored are therefore not written to the output files.
+        ``max_results`` is rounded up to whole pages, which are the only
+        positions a continuation token can resume from.
+        """
+        try:
+            logger.info("Starting bulk paper crawl...")
+            query = build_search_text(topic, custom_query)
+            year_filter = format_year_filter(year, year_end)
+            
+            checkpoint = self._load_checkpoint(f"bulk:{query}:{year_filter or 'all'}", topic, year, resume)
+            if checkpoint is None:
+                return 0
+            
+            paginator = BulkSearchPaginator(
+                self.client,
+                query,
+                year=year_filter,
+                fields_of_study=CRAWLER_CONFIG['fields_of_study'],
+                max_results=max_results,
+                cursor=SearchCursor(offset=checkpoint.offset, token=checkpoint.token)
+            )
+            processed = self._ingest(paginator, self._hydrate(paginator.pages()), checkpoint,
+                                     self._output_stem("papers_bulk", topic, year, year_end), topic)
+            
+            logger.info(f"Bulk crawl completed. Processed {processed} papers in {paginator.requests_made} search requests.")
+            return processed
+        except Exception as e:
+            logger.error(f"Error during bulk crawl: {e}")
+            raise
+        finally:
+            try:
+                self.session.close()
+                self.client.close()
+            except Exception as e:
+                logger.error(f"Error closing session: {e}")
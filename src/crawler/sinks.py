@@ -0,0 +1,238 @@
+import csv
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Iterable, List, Optional
+from crawler.records import PaperRecord
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, only needed for zstd output
+    zstandard = None
+
+CSV_FIELDNAMES = ['title', 'authors', 'abstract', 'year', 'citations', 'url', 'fields_of_study']
+
+COMPRESSION_SUFFIXES = {
+    None: '',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+BUFFER_SIZE = 1024 * 1024
+
+# Codec per OUTPUT_COMPRESSION setting; columnar files are always compressed,
+# and Arrow IPC only supports lz4 and zstd
+COLUMNAR_CODECS = {
+    'parquet': {None: 'snappy', 'gzip': 'gzip', 'zstd': 'zstd'},
+    'arrow': {None: 'lz4', 'gzip': 'zstd', 'zstd': 'zstd'},
+}
+
+# Papers per Parquet row group / Arrow record batch
+ROW_GROUP_SIZE = 10000
+
+
+def require_pyarrow():
+    """Import pyarrow on first use; it is optional and slow to import"""
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Parquet and Arrow output require the 'pyarrow' package") from e
+    return pyarrow
+
+
+def paper_schema(with_created_at: bool = False):
+    """Arrow schema of papers written to columnar files"""
+    pa = require_pyarrow()
+    fields = [
+        ('paper_id', pa.string()),
+        ('doi', pa.string()),
+        ('title', pa.string()),
+        ('authors', pa.string()),
+        ('abstract', pa.string()),
+        ('year', pa.int32()),
+        ('citations', pa.int64()),
+        ('url', pa.string()),
+        ('fields_of_study', pa.list_(pa.string())),
+        ('topic', pa.string()),
+    ]
+    if with_created_at:
+        fields.append(('created_at', pa.timestamp('us')))
+    return pa.schema(fields)
+
+
+def open_output(path: Path, compression: Optional[str] = None):
+    """Open a buffered text stream for writing, optionally compressed"""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if compression == 'gzip':
+        raw = gzip.open(path, 'wb', compresslevel=6)
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd output requires the 'zstandard' package")
+        raw = zstandard.ZstdCompressor(level=3).stream_writer(open(path, 'wb'))
+    else:
+        raw = open(path, 'wb')
+    return io.TextIOWrapper(io.BufferedWriter(raw, BUFFER_SIZE), encoding='utf-8', newline='')
+
+
+class FileSink:
+    """Keeps one buffered file handle open for a whole crawl run"""
+
+    extension = ''
+
+    def __init__(self, path_stem: Path, compression: Optional[str] = None):
+        self.path = Path(f"{path_stem}{self.extension}{COMPRESSION_SUFFIXES[compression]}")
+        self.count = 0
+        self._stream = open_output(self.path, compression)
+
+    def write(self, paper: PaperRecord):
+        self._write(paper)
+        self.count += 1
+
+    def write_many(self, papers: Iterable[PaperRecord]):
+        for paper in papers:
+            self.write(paper)
+
+    def _write(self, paper: PaperRecord):
+        raise NotImplementedError
+
+    def close(self):
+        if self._stream.closed:
+            return
+        self._stream.close()
+        logger.info(f"Wrote {self.count} papers to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvSink(FileSink):
+    """Streams papers into a CSV file"""
+
+    extension = '.csv'
+
+    def __init__(self, path_stem: Path, compression: Optional[str] = None):
+        super().__init__(path_stem, compression)
+        self._writer = csv.writer(self._stream)
+        self._writer.writerow(CSV_FIELDNAMES)
+
+    def _write(self, paper: PaperRecord):
+        # Same order as CSV_FIELDNAMES
+        self._writer.writerow((
+            paper.title,
+            paper.authors,
+            paper.abstract.replace('\n', ' ').replace('\r', ' '),
+            paper.year,
+            paper.citations,
+            paper.url,
+            ','.join(paper.fields_of_study)
+        ))
+
+
+class JsonlSink(FileSink):
+    """Streams papers into newline-delimited JSON, one paper per line"""
+
+    extension = '.jsonl'
+
+    def _write(self, paper: PaperRecord):
+        self._stream.write(json.dumps(paper.to_dict(), ensure_ascii=False))
+        self._stream.write('\n')
+
+
+class ColumnarSink(FileSink):
+    """Buffers papers column by column into record batches of a compressed columnar file"""
+
+    format_name = ''
+
+    def __init__(self, path_stem: Path, compression: Optional[str] = None):
+        if compression not in COLUMNAR_CODECS[self.format_name]:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.pa = require_pyarrow()
+        # Compression is internal to the format, so no compression suffix
+        self.path = Path(f"{path_stem}{self.extension}")
+        self.count = 0
+        self.schema = paper_schema()
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+        self._closed = False
+        self._writer = self._open_writer(COLUMNAR_CODECS[self.format_name][compression])
+
+    def _open_writer(self, codec: str):
+        raise NotImplementedError
+
+    def _write(self, paper: PaperRecord):
+        for name, values in self._columns.items():
+            values.append(getattr(paper, name))
+        self._buffered += 1
+        if self._buffered >= ROW_GROUP_SIZE:
+            self._flush_rows()
+
+    def _flush_rows(self):
+        if self._buffered:
+            self._writer.write_batch(self.pa.RecordBatch.from_pydict(self._columns, schema=self.schema))
+            self._columns = {name: [] for name in self.schema.names}
+            self._buffered = 0
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._flush_rows()
+        finally:
+            self._writer.close()
+        logger.info(f"Wrote {self.count} papers to {self.path}")
+
+
+class ParquetSink(ColumnarSink):
+    """Streams papers into a Parquet file, one row group per batch"""
+
+    extension = '.parquet'
+    format_name = 'parquet'
+
+    def _open_writer(self, codec: str):
+        return self.pa.parquet.ParquetWriter(self.path, self.schema, compression=codec)
+
+
+class ArrowSink(ColumnarSink):
+    """Streams papers into an Arrow IPC (Feather v2) file"""
+
+    extension = '.arrow'
+    format_name = 'arrow'
+
+    def _open_writer(self, codec: str):
+        options = self.pa.ipc.IpcWriteOptions(compression=codec)
+        return self.pa.ipc.new_file(str(self.path), self.schema, options=options)
+
+
+SINK_TYPES = {
+    'csv': CsvSink,
+    'jsonl': JsonlSink,
+    'parquet': ParquetSink,
+    'arrow': ArrowSink,
+}
+
+
+def open_sinks(path_stem: Path, formats: Iterable[str], compression: Optional[str] = None) -> List[FileSink]:
+    """Open one sink per requested format sharing the same file name stem"""
+    sinks = []
+    try:
+        for name in formats:
+            if name not in SINK_TYPES:
+                raise ValueError(f"Unknown output format: {name}")
+            sinks.append(SINK_TYPES[name](path_stem, compression))
+    except Exception:
+        for sink in sinks:
+            sink.close()
+        raise
+    return sinks
@@ -1,32 +1,95 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
-import os
-from datetime import datetime
+import threading
+import time
+from typing import Optional
+from config.settings import LOG_CONFIG
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def _configure():
+    """Route all records through one queue to a shared console and rotating file handler"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        handlers = [console_handler]
+        try:
+            LOG_CONFIG['dir'].mkdir(parents=True, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                LOG_CONFIG['dir'] / 'crawler.log',
+                maxBytes=LOG_CONFIG['max_bytes'],
+                backupCount=LOG_CONFIG['backup_count'],
+                encoding='utf-8'
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+        except OSError as e:
+            console_handler.handle(logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': f"Logging to console only, cannot open log file: {e}",
+            }))
+
+        # Callers only enqueue records; formatting and I/O happen on the listener thread
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        root = logging.getLogger()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
 
 def setup_logger(name):
-    """Setup and return a logger with consistent formatting"""
+    """Return a logger whose records go through the shared non-blocking handlers"""
+    _configure()
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-
-    # Create logs directory if it doesn't exist
-    logs_dir = os.path.join(os.getcwd(), 'logs')
-    os.makedirs(logs_dir, exist_ok=True)
-
-    # Create handlers
-    console_handler = logging.StreamHandler(sys.stdout)
-    file_handler = logging.FileHandler(
-        os.path.join(logs_dir, f'crawler_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-    )
-
-    # Create formatters
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
-
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-
-    return logger 
\ No newline at end of file
+    logger.setLevel(LOG_CONFIG['level'])
+    return logger
+
+
+class ProgressLogger:
+    """Rate-limited progress lines for hot loops.
+
+    In ``aggregated`` mode one summary with the running total and rate is
+    logged at most every ``interval`` seconds; in ``sampled`` mode one line
+    is logged every ``every`` items; ``off`` logs nothing. ``add`` is cheap
+    enough to call per item.
+    """
+
+    def __init__(self, logger: logging.Logger, label: str = 'papers processed', mode: Optional[str] = None,
+                 interval: Optional[float] = None, every: Optional[int] = None):
+        self.logger = logger
+        self.label = label
+        self.mode = mode or LOG_CONFIG['progress_mode']
+        self.interval = interval if interval is not None else LOG_CONFIG['progress_interval']
+        self.every = every or LOG_CONFIG['progress_every']
+        self.count = 0
+        self._started = time.monotonic()
+        self._next_log = self._started + self.interval
+        self._lock = threading.Lock()
+
+    def add(self, amount: int = 1):
+        with self._lock:
+            before = self.count
+            self.count += amount
+            if self.mode == 'sampled':
+                if self.count // self.every > before // self.every:
+                    self._log()
+            elif self.mode == 'aggregated':
+                now = time.monotonic()
+                if now >= self._next_log:
+                    self._next_log = now + self.interval
+                    self._log(now)
+
+    def _log(self, now: Optional[float] = None):
+        elapsed = (now or time.monotonic()) - self._started
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        self.logger.info(f"Progress: {self.count} {self.label} ({rate:.1f}/s)")
@@ -0,0 +1,279 @@
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Seconds; suits both API round trips and database flushes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: Tuple, extra: Optional[Tuple] = None) -> str:
+    pairs = list(key) + list(extra or ())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """Monotonic count, optionally split by labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str = ''):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def total(self) -> float:
+        return sum(self._values.values())
+
+    def samples(self):
+        for key, value in list(self._values.items()):
+            yield self.name, key, value
+
+    def snapshot(self):
+        if list(self._values) in ([], [()]):
+            return self.total()
+        return {_format_labels(key) or 'total': value for key, value in self._values.items()}
+
+
+class Gauge:
+    """Current value, either set directly or read from a callback on export"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str = ''):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[Tuple, float] = {}
+        self._functions: Dict[Tuple, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        self._values[_label_key(labels)] = value
+
+    def set_function(self, function: Callable[[], float], **labels):
+        self._functions[_label_key(labels)] = function
+
+    def samples(self):
+        values = dict(self._values)
+        for key, function in list(self._functions.items()):
+            try:
+                values[key] = function()
+            except Exception:
+                continue
+        for key, value in values.items():
+            yield self.name, key, value
+
+    def snapshot(self):
+        values = {key: value for _, key, value in self.samples()}
+        if list(values) in ([], [()]):
+            return values.get(())
+        return {_format_labels(key): value for key, value in values.items()}
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str = '', buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (last one is +Inf), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        for key, (counts, total, count) in list(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield f"{self.name}_bucket", key + (('le', le),), cumulative
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, count
+
+    def snapshot(self):
+        result = {}
+        for key, (counts, total, count) in list(self._series.items()):
+            result[_format_labels(key) or 'all'] = {
+                'count': count,
+                'sum': round(total, 6),
+                'mean': round(total / count, 6) if count else None,
+            }
+        return result
+
+
+class MetricsRegistry:
+    """Named metrics of this process, rendered as Prometheus text or a JSON snapshot"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str = '') -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = '') -> Gauge:
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = '', buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key)} {value}")
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict:
+        snapshot = {'timestamp': time.time(), 'uptime_seconds': round(time.time() - self.started, 3)}
+        for name, metric in list(self._metrics.items()):
+            snapshot[name] = metric.snapshot()
+        return snapshot
+
+
+REGISTRY = MetricsRegistry()
+
+# Metrics recorded throughout the crawler
+API_REQUEST_SECONDS = REGISTRY.histogram('s2_api_request_seconds', 'Semantic Scholar API round trip time by endpoint')
+API_REQUESTS = REGISTRY.counter('s2_api_requests_total', 'Semantic Scholar API responses by endpoint and status')
+API_RETRIES = REGISTRY.counter('s2_api_retries_total', 'API requests retried after a failure')
+API_THROTTLED = REGISTRY.counter('s2_api_throttled_total', 'API requests answered with 429')
+PAPERS_PROCESSED = REGISTRY.counter('crawler_papers_processed_total', 'Papers parsed from API responses')
+PAPERS_STORED = REGISTRY.counter('crawler_papers_stored_total', 'Papers written to the database')
+PAPERS_SKIPPED = REGISTRY.counter('crawler_papers_skipped_total', 'Papers dropped as already stored')
+DB_FLUSH_SECONDS = REGISTRY.histogram('db_flush_seconds', 'Time to write and commit one batch of papers')
+QUEUE_DEPTH = REGISTRY.gauge('crawler_queue_depth', 'Items waiting in a pipeline queue')
+REGISTRY.gauge('crawler_papers_per_second', 'Papers processed per second since start').set_function(
+    lambda: PAPERS_PROCESSED.total() / max(time.time() - REGISTRY.started, 1e-9)
+)
+
+
+def _make_handler(registry: MetricsRegistry):
+    # http.server is imported only when metrics are served; it is slow to import
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MetricsHandler
+
+
+def start_http_server(port: int, host: str = '0.0.0.0', registry: MetricsRegistry = REGISTRY):
+    """Serve /metrics in Prometheus text format from a background thread"""
+    from http.server import ThreadingHTTPServer
+    server = ThreadingHTTPServer((host, port), _make_handler(registry))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logger.info(f"Serving metrics at http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+class JsonDumper:
+    """Writes a JSON snapshot of the registry to ``path`` every ``interval`` seconds and on stop"""
+
+    def __init__(self, path: Path, interval: float = 10.0, registry: MetricsRegistry = REGISTRY):
+        self.path = Path(path)
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-json', daemon=True)
+
+    def dump(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp.write_text(json.dumps(self.registry.snapshot(), indent=2))
+        # Readers never see a half-written file
+        tmp.replace(self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.dump()
+            except Exception as e:
+                logger.warning(f"Could not write metrics to {self.path}: {e}")
+
+    def start(self) -> 'JsonDumper':
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.dump()
+
+
+def start_exporters(port: Optional[int] = None, json_path: Optional[str] = None,
+                    interval: float = 10.0) -> Optional[JsonDumper]:
+    """Start the configured exporters; returns the JSON dumper so it can be stopped at exit"""
+    if port:
+        start_http_server(port)
+    if json_path:
+        return JsonDumper(Path(json_path), interval).start()
+    return None
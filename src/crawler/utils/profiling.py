@@ -0,0 +1,51 @@
+import cProfile
+import pstats
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@contextmanager
+def profiled(path: Path):
+    """Profile the block with cProfile, including threads it starts, and write pstats output to ``path``.
+
+    cProfile only sees the thread that enabled it, so every thread started
+    inside the block gets its own profiler; all of them are merged into one
+    file that ``python -m pstats``, snakeviz or gprof2dot can read.
+    """
+    path = Path(path)
+    profilers: List[cProfile.Profile] = []
+    lock = threading.Lock()
+
+    def start_thread_profiler(frame, event, arg):
+        profiler = cProfile.Profile()
+        with lock:
+            profilers.append(profiler)
+        sys.setprofile(None)
+        profiler.enable()
+
+    main_profiler = cProfile.Profile()
+    threading.setprofile(start_thread_profiler)
+    main_profiler.enable()
+    try:
+        yield
+    finally:
+        main_profiler.disable()
+        threading.setprofile(None)
+        stats = pstats.Stats(main_profiler)
+        with lock:
+            for profiler in profilers:
+                profiler.disable()
+                try:
+                    stats.add(profiler)
+                except TypeError:
+                    # A thread that never made a call has nothing to merge
+                    continue
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(str(path))
+        logger.info(f"Wrote profile of {len(profilers) + 1} threads to {path}")
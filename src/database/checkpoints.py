@@ -0,0 +1,71 @@
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from database.models import CrawlState
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+STATUS_PENDING = 'pending'
+STATUS_IN_PROGRESS = 'in_progress'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+
+
+class CheckpointStore:
+    """Reads and advances crawl_state rows.
+
+    The cursor of a page that stored papers is only moved by ``advance`` inside
+    the writer's transaction, so a resumed crawl never skips unstored results.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def load(self, query: str, topic: Optional[str] = None, year: Optional[int] = None) -> CrawlState:
+        """Return the checkpoint for a unit of work, creating a pending one if needed"""
+        state = self.session.query(CrawlState).filter_by(query=query, year=year).first()
+        if state is not None:
+            return state
+        state = CrawlState(query=query, topic=topic, year=year, offset=0, status=STATUS_PENDING,
+                           papers_stored=0, requests=0)
+        self.session.add(state)
+        try:
+            self.session.commit()
+        except IntegrityError:
+            # Another worker created the same unit concurrently
+            self.session.rollback()
+            state = self.session.query(CrawlState).filter_by(query=query, year=year).one()
+        return state
+
+    def advance(self, state: CrawlState, offset: int, token: Optional[str] = None,
+                papers_stored: int = 0, requests: int = 0, status: str = STATUS_IN_PROGRESS):
+        """Stage progress in the session without committing it
+
+        Pass this to ``PaperBatchWriter.flush`` as its ``progress`` callback so
+        the offset only moves in the transaction that stores the page.
+        """
+        state.offset = offset
+        state.token = token
+        state.status = status
+        state.papers_stored += papers_stored
+        state.requests += requests
+
+    def save_progress(self, state: CrawlState, offset: int, token: Optional[str] = None,
+                      papers_stored: int = 0, requests: int = 0, status: str = STATUS_IN_PROGRESS):
+        """Commit a change of cursor or status that involves no stored papers"""
+        self.advance(state, offset, token, papers_stored, requests, status)
+        try:
+            self.session.commit()
+        except Exception as e:
+            logger.error(f"Error saving checkpoint for {state}: {e}")
+            self.session.rollback()
+            raise
+
+    def mark(self, state: CrawlState, status: str):
+        """Change the status of a unit without moving its offset"""
+        self.save_progress(state, state.offset, state.token, status=status)
+
+    def reset(self, state: CrawlState):
+        """Forget the progress of a unit so it is crawled again from the start"""
+        self.save_progress(state, 0, None, papers_stored=-state.papers_stored,
+                           requests=-state.requests, status=STATUS_PENDING)
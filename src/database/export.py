@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import and_, or_, select
+from config.settings import CRAWLER_CONFIG
+from crawler.sinks import COLUMNAR_CODECS, paper_schema, require_pyarrow
+from database.models import Paper, PaperField
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+EXPORT_FORMATS = {
+    'parquet': 'parquet',
+    'arrow': 'ipc',
+}
+
+WATERMARK_FILE = '_watermark.json'
+
+EXPORT_COLUMNS = (Paper.id, Paper.paper_id, Paper.doi, Paper.title, Paper.authors, Paper.abstract,
+                  Paper.year, Paper.citations, Paper.url, Paper.topic, Paper.created_at)
+
+
+class ExportResult:
+    """Rows and files written by one export run"""
+
+    def __init__(self, rows: int = 0, files: int = 0, watermark: Optional[Dict] = None):
+        self.rows = rows
+        self.files = files
+        self.watermark = watermark
+
+    def __repr__(self):
+        return f"<ExportResult(rows={self.rows}, files={self.files}, watermark={self.watermark})>"
+
+
+class PaperExporter:
+    """Streams the papers table into a year/topic partitioned Parquet or Arrow dataset.
+
+    Rows are read through a server-side cursor in ``(created_at, id)`` order
+    and written as Hive-style partitions (``year=2001/topic=Algebra/``) of
+    compressed files. The last exported ``(created_at, id)`` is kept in
+    ``_watermark.json`` in the output directory, so each run only appends
+    papers stored since the previous one. Papers younger than
+    ``settle_seconds`` are left for the next run, because a concurrent
+    crawler may still commit rows with an earlier created_at.
+
+    Files are written to a staging directory and moved into place before the
+    watermark advances, so an interrupted run leaves no partial output.
+    """
+
+    def __init__(self, session, output_dir: Optional[Path] = None, file_format: Optional[str] = None,
+                 compression: Optional[str] = None, batch_size: Optional[int] = None,
+                 settle_seconds: Optional[float] = None):
+        self.session = session
+        self.output_dir = Path(output_dir or CRAWLER_CONFIG['export_dir'])
+        self.file_format = file_format or CRAWLER_CONFIG['export_format']
+        if self.file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {self.file_format}")
+        compression = compression if compression is not None else CRAWLER_CONFIG['export_compression']
+        if compression not in COLUMNAR_CODECS[self.file_format]:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.codec = COLUMNAR_CODECS[self.file_format][compression]
+        self.batch_size = batch_size or CRAWLER_CONFIG['export_batch_size']
+        self.settle_seconds = settle_seconds if settle_seconds is not None else CRAWLER_CONFIG['export_settle_seconds']
+        self.pa = require_pyarrow()
+        self.schema = paper_schema(with_created_at=True)
+
+    @property
+    def watermark_path(self) -> Path:
+        return self.output_dir / WATERMARK_FILE
+
+    def load_watermark(self) -> Optional[Dict]:
+        """The last exported {'created_at': iso, 'id': int}, or None before the first run"""
+        if not self.watermark_path.exists():
+            return None
+        return json.loads(self.watermark_path.read_text())
+
+    def _save_watermark(self, watermark: Dict):
+        tmp = self.watermark_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(watermark))
+        tmp.replace(self.watermark_path)
+
+    def _query(self, watermark: Optional[Dict], cutoff: datetime):
+        stmt = select(*EXPORT_COLUMNS).where(Paper.created_at <= cutoff)
+        if watermark:
+            since = datetime.fromisoformat(watermark['created_at'])
+            stmt = stmt.where(or_(
+                Paper.created_at > since,
+                and_(Paper.created_at == since, Paper.id > watermark['id'])
+            ))
+        return stmt.order_by(Paper.created_at, Paper.id)
+
+    def _fields_of_study(self, paper_pks: List[int]) -> Dict[int, List[str]]:
+        fields: Dict[int, List[str]] = {}
+        rows = self.session.execute(
+            select(PaperField.paper_id, PaperField.field).where(PaperField.paper_id.in_(paper_pks))
+        )
+        for paper_pk, field in rows:
+            fields.setdefault(paper_pk, []).append(field)
+        return fields
+
+    def _batches(self, watermark: Optional[Dict], cutoff: datetime, progress: Dict) -> Iterator:
+        """Record batches of papers after the watermark; ``progress`` tracks the last row seen"""
+        result = self.session.execute(
+            self._query(watermark, cutoff),
+            # Streams from a server-side cursor instead of loading every row
+            execution_options={'yield_per': self.batch_size}
+        )
+        for rows in result.partitions():
+            fields = self._fields_of_study([row.id for row in rows])
+            yield self.pa.RecordBatch.from_pylist([
+                {
+                    'paper_id': row.paper_id,
+                    'doi': row.doi,
+                    'title': row.title,
+                    'authors': row.authors,
+                    'abstract': row.abstract,
+                    'year': row.year,
+                    'citations': row.citations,
+                    'url': row.url,
+                    'fields_of_study': fields.get(row.id, []),
+                    'topic': row.topic,
+                    'created_at': row.created_at,
+                }
+                for row in rows
+            ], schema=self.schema)
+            progress['rows'] += len(rows)
+            progress['watermark'] = {'created_at': rows[-1].created_at.isoformat(), 'id': rows[-1].id}
+            logger.info(f"Exported {progress['rows']} papers")
+
+    def _file_options(self):
+        ds = self.pa.dataset
+        if self.file_format == 'parquet':
+            return ds.ParquetFileFormat().make_write_options(compression=self.codec)
+        return ds.IpcFileFormat().make_write_options(compression=self.codec)
+
+    def _publish(self, staging: Path) -> int:
+        """Move the staged files into the output directory; returns how many"""
+        files = 0
+        for path in staging.rglob('*'):
+            if path.is_file():
+                target = self.output_dir / path.relative_to(staging)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(path, target)
+                files += 1
+        return files
+
+    def run(self, full: bool = False) -> ExportResult:
+        """Export papers stored since the last run, or all of them with ``full``"""
+        ds = self.pa.dataset
+        watermark = None if full else self.load_watermark()
+        cutoff = datetime.utcnow() - timedelta(seconds=self.settle_seconds)
+        logger.info(f"Exporting papers to {self.output_dir} as {self.file_format} "
+                    f"({'all' if watermark is None else 'after ' + watermark['created_at']})")
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        run_id = datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')
+        staging = self.output_dir / f'_staging_{run_id}'
+        progress = {'rows': 0, 'watermark': None}
+        try:
+            ds.write_dataset(
+                self._batches(watermark, cutoff, progress),
+                staging,
+                schema=self.schema,
+                format=EXPORT_FORMATS[self.file_format],
+                file_options=self._file_options(),
+                partitioning=ds.partitioning(
+                    self.pa.schema([('year', self.pa.int32()), ('topic', self.pa.string())]),
+                    flavor='hive'
+                ),
+                basename_template=f'part-{run_id}-{{i}}.{self.file_format}',
+                max_rows_per_group=self.batch_size,
+                max_partitions=100000,
+                existing_data_behavior='overwrite_or_ignore'
+            )
+            files = self._publish(staging) if progress['rows'] else 0
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        if progress['watermark']:
+            self._save_watermark(progress['watermark'])
+        result = ExportResult(progress['rows'], files, progress['watermark'] or watermark)
+        logger.info(f"Export completed: {result}")
+        return result
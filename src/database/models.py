@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy import DDL, Column, Integer, BigInteger, Float, String, DateTime, ForeignKey, Index, UniqueConstraint, event
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -9,20 +9,143 @@ class Paper(Base):
     __tablename__ = 'papers'
 
     id = Column(Integer, primary_key=True)
-    title = Column(String, unique=True, nullable=False)
+    paper_id = Column(String(40), unique=True)  # Semantic Scholar paperId
+    doi = Column(String)
+    title = Column(String, nullable=False)
+    # 64-bit hash of the normalized title; carries the uniqueness check instead of the full title
+    title_hash = Column(BigInteger, nullable=False)
     authors = Column(String)
     abstract = Column(String)
     year = Column(Integer)
     citations = Column(Integer)
     url = Column(String)
+    # Topic of the crawl that first stored the paper
+    topic = Column(String)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # When the stored values last changed and when a refresh last changed the citation count
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+    # Citations gained per day between the last two changes of the count
+    citation_velocity = Column(Float, nullable=False, default=0.0)
 
     # Define indexes
     __table_args__ = (
-        Index('idx_papers_title', 'title'),
+        Index('idx_papers_title_hash', 'title_hash', unique=True),
+        Index('idx_papers_doi', 'doi'),
         Index('idx_papers_year', 'year'),
         Index('idx_papers_citations', 'citations'),
+        Index('idx_papers_refreshed_at', 'refreshed_at'),
+        # Incremental exports walk papers in (created_at, id) order
+        Index('idx_papers_created_at', 'created_at', 'id'),
     )
 
     def __repr__(self):
-        return f"<Paper(title='{self.title}', year={self.year}, citations={self.citations})>" 
\ No newline at end of file
+        return f"<Paper(title='{self.title}', year={self.year}, citations={self.citations})>"
+
+# Postgres full-text search over title (weight A) and abstract (weight B). The
+# generated column and its GIN index exist only on Postgres, so they are added
+# as DDL rather than mapped; database.search queries them.
+SEARCH_LANGUAGE = 'english'
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(abstract, '')), 'B')"
+)
+SEARCH_VECTOR_DDL = (
+    f"ALTER TABLE papers ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+)
+SEARCH_INDEX_DDL = "CREATE INDEX IF NOT EXISTS idx_papers_search_vector ON papers USING GIN (search_vector)"
+
+event.listen(Paper.__table__, 'after_create', DDL(SEARCH_VECTOR_DDL).execute_if(dialect='postgresql'))
+event.listen(Paper.__table__, 'after_create', DDL(SEARCH_INDEX_DDL).execute_if(dialect='postgresql'))
+
+class Author(Base):
+    """Paper author, keyed by Semantic Scholar authorId where one is known"""
+    __tablename__ = 'authors'
+
+    id = Column(Integer, primary_key=True)
+    # NULL for authors known only by name, e.g. backfilled from Paper.authors
+    s2_author_id = Column(String(20), unique=True)
+    name = Column(String, nullable=False)
+
+    __table_args__ = (
+        Index('idx_authors_name', 'name'),
+    )
+
+    def __repr__(self):
+        return f"<Author(name='{self.name}', s2_author_id={self.s2_author_id})>"
+
+class PaperAuthor(Base):
+    """Authorship of a paper, in byline order"""
+    __tablename__ = 'paper_authors'
+
+    paper_id = Column(Integer, ForeignKey('papers.id', ondelete='CASCADE'), primary_key=True)
+    author_id = Column(Integer, ForeignKey('authors.id', ondelete='CASCADE'), primary_key=True)
+    position = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # The primary key serves lookups by paper; this one serves lookups by author
+        Index('idx_paper_authors_author_id', 'author_id', 'paper_id'),
+    )
+
+class PaperField(Base):
+    """Semantic Scholar field of study of a paper"""
+    __tablename__ = 'paper_fields'
+
+    paper_id = Column(Integer, ForeignKey('papers.id', ondelete='CASCADE'), primary_key=True)
+    field = Column(String, primary_key=True)
+
+    __table_args__ = (
+        Index('idx_paper_fields_field', 'field', 'paper_id'),
+    )
+
+class PaperRefresh(Base):
+    """When the refresh job last re-fetched a paper's citation count.
+
+    Kept out of papers so that checking an unchanged paper never rewrites its row.
+    """
+    __tablename__ = 'paper_refresh'
+
+    paper_id = Column(Integer, ForeignKey('papers.id', ondelete='CASCADE'), primary_key=True)
+    checked_at = Column(DateTime, nullable=False)
+
+class CrawlState(Base):
+    """Checkpoint of one (query, year) unit of crawl work"""
+    __tablename__ = 'crawl_state'
+
+    id = Column(Integer, primary_key=True)
+    query = Column(String, nullable=False)
+    topic = Column(String)
+    year = Column(Integer)
+    offset = Column(Integer, nullable=False, default=0)
+    token = Column(String)
+    status = Column(String, nullable=False, default='pending')
+    papers_stored = Column(Integer, nullable=False, default=0)
+    requests = Column(Integer, nullable=False, default=0)
+    # Worker holding the unit in work-queue mode and when its claim lapses
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('query', 'year', name='uq_crawl_state_query_year'),
+        Index('idx_crawl_state_status', 'status'),
+        Index('idx_crawl_state_lease_owner', 'lease_owner'),
+    )
+
+    def __repr__(self):
+        return f"<CrawlState(query='{self.query}', year={self.year}, offset={self.offset}, status='{self.status}')>"
+
+
+class RateBudget(Base):
+    """Token bucket shared by every crawler process using the same database"""
+    __tablename__ = 'rate_budget'
+
+    name = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    # Unix time of the last refill
+    updated_at = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<RateBudget(name='{self.name}', tokens={self.tokens:.2f})>"
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from database.models import RateBudget
+from database.session import get_engine
+from crawler.rate_limiter import RateLimiter
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SharedRateBudget(RateLimiter):
+    """Rate limiter whose token bucket lives in the ``rate_budget`` table.
+
+    Every process pointing at the same database draws from one bucket, so
+    ``rate`` is the budget of the whole fleet rather than of one worker. Each
+    reservation is a short ``SELECT ... FOR UPDATE`` / ``UPDATE`` transaction on
+    its own pooled connection; coroutines run it on a worker thread so the
+    round-trip never stalls the event loop. A 429 seen by any worker puts the shared bucket
+    in debt for the Retry-After, pausing all of them. If the database is
+    unreachable the local bucket alone paces requests.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, name: str = 'semantic_scholar', **kwargs):
+        super().__init__(rate, burst, **kwargs)
+        self.name = name
+        self._created = False
+
+    def _ensure_bucket(self):
+        if self._created:
+            return
+        try:
+            with get_engine().begin() as conn:
+                if conn.execute(select(RateBudget.name).where(RateBudget.name == self.name)).first() is None:
+                    conn.execute(RateBudget.__table__.insert().values(
+                        name=self.name, tokens=float(self.burst), updated_at=time.time()))
+        except IntegrityError:
+            # Another worker created the bucket first
+            pass
+        self._created = True
+
+    def _take(self, conn, cost: float = 1.0, floor: Optional[float] = None) -> float:
+        """Refill the shared bucket, spend ``cost`` tokens and return the balance"""
+        now = time.time()
+        row = conn.execute(
+            select(RateBudget.tokens, RateBudget.updated_at)
+            .where(RateBudget.name == self.name)
+            .with_for_update()
+        ).one()
+        tokens = min(self.burst, row.tokens + max(0.0, now - row.updated_at) * self.base_rate) - cost
+        if floor is not None:
+            tokens = min(tokens, floor)
+        conn.execute(
+            update(RateBudget).where(RateBudget.name == self.name).values(tokens=tokens, updated_at=now)
+        )
+        return tokens
+
+    def _reserve_shared(self) -> float:
+        self._ensure_bucket()
+        with get_engine().begin() as conn:
+            tokens = self._take(conn)
+        return -tokens / self.base_rate if tokens < 0 else 0.0
+
+    def _reserve(self) -> float:
+        wait = super()._reserve()
+        try:
+            return max(wait, self._reserve_shared())
+        except Exception as e:
+            logger.warning(f"Shared rate budget unavailable, pacing locally: {e}")
+            return wait
+
+    async def acquire_async(self):
+        """Wait without blocking the event loop until a request may be sent"""
+        wait = await asyncio.to_thread(self._reserve)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def penalize_async(self, retry_after: Optional[float] = None):
+        await asyncio.to_thread(self.penalize, retry_after)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        super().penalize(retry_after)
+        pause = retry_after if retry_after is not None else 1 / self.rate
+        try:
+            self._ensure_bucket()
+            with get_engine().begin() as conn:
+                # Debt that takes ``pause`` seconds to pay back at the configured rate
+                self._take(conn, cost=0.0, floor=-pause * self.base_rate)
+        except Exception as e:
+            logger.warning(f"Could not share rate limit penalty: {e}")
@@ -0,0 +1,92 @@
+from typing import List, Optional
+from sqlalchemy import and_, func, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from database.models import Paper, SEARCH_LANGUAGE
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SORT_ORDERS = ('rank', 'citations', 'year')
+
+
+class SearchHit:
+    """One paper matching a search, with its relevance rank"""
+
+    __slots__ = ('id', 'paper_id', 'title', 'authors', 'year', 'citations', 'url', 'rank')
+
+    def __init__(self, id, paper_id, title, authors, year, citations, url, rank):
+        self.id = id
+        self.paper_id = paper_id
+        self.title = title
+        self.authors = authors
+        self.year = year
+        self.citations = citations
+        self.url = url
+        self.rank = rank
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"<SearchHit(title='{self.title}', year={self.year}, rank={self.rank:.4f})>"
+
+
+class PaperSearch:
+    """Keyword search over stored titles and abstracts.
+
+    On Postgres the query is parsed with ``websearch_to_tsquery`` (quoted
+    phrases, ``or``, ``-term``) and matched against the GIN-indexed
+    ``search_vector`` column, ranked with ``ts_rank_cd`` so title hits outrank
+    abstract hits. Other databases fall back to a LIKE scan that requires
+    every word and has no relevance rank; it is meant for tests and local
+    SQLite runs only.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    def _filters(self, year_from: Optional[int], year_to: Optional[int], min_citations: Optional[int]) -> List:
+        filters = []
+        if year_from is not None:
+            filters.append(Paper.year >= year_from)
+        if year_to is not None:
+            filters.append(Paper.year <= year_to)
+        if min_citations is not None:
+            filters.append(Paper.citations >= min_citations)
+        return filters
+
+    def _match(self, query: str):
+        """(match condition, rank expression) for the session's dialect"""
+        if self.session.get_bind().dialect.name == 'postgresql':
+            ts_query = func.websearch_to_tsquery(SEARCH_LANGUAGE, query)
+            vector = literal_column('papers.search_vector', type_=TSVECTOR)
+            return vector.op('@@')(ts_query), func.ts_rank_cd(vector, ts_query)
+        words = query.split()
+        condition = and_(*(or_(Paper.title.ilike(f'%{word}%'), Paper.abstract.ilike(f'%{word}%')) for word in words))
+        return condition, literal(0.0)
+
+    def search(self, query: str, year_from: Optional[int] = None, year_to: Optional[int] = None,
+               min_citations: Optional[int] = None, sort: str = 'rank', limit: int = 20,
+               offset: int = 0) -> List[SearchHit]:
+        """Papers matching ``query`` within the filters, best first"""
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"Unknown sort order '{sort}', expected one of {', '.join(SORT_ORDERS)}")
+        if not query.strip():
+            return []
+        condition, rank = self._match(query)
+        rank = rank.label('rank')
+        order = {
+            'rank': [rank.desc(), Paper.citations.desc()],
+            'citations': [Paper.citations.desc(), rank.desc()],
+            'year': [Paper.year.desc(), rank.desc()],
+        }[sort]
+        stmt = (
+            select(Paper.id, Paper.paper_id, Paper.title, Paper.authors, Paper.year, Paper.citations, Paper.url, rank)
+            .where(condition, *self._filters(year_from, year_to, min_citations))
+            .order_by(*order, Paper.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        hits = [SearchHit(*row) for row in self.session.execute(stmt)]
+        logger.debug(f"Search {query!r} returned {len(hits)} papers")
+        return hits
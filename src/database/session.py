@@ -1,8 +1,7 @@
-import os
+import threading
 import time
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import QueuePool
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import OperationalError
 from database.models import Base
 from config.settings import DB_CONFIG
@@ -10,22 +9,59 @@ from crawler.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+_engine = None
+_session_factory = None
+_init_lock = threading.Lock()
+
 def get_database_url():
-    """Get database URL from environment variables"""
-    host = os.getenv('POSTGRES_HOST', 'postgres')
-    port = os.getenv('POSTGRES_PORT', '5432')
-    db = os.getenv('POSTGRES_DB', 'scholar_db')
-    user = os.getenv('POSTGRES_USER', 'postgres')
-    password = os.getenv('POSTGRES_PASSWORD', 'postgres')
-    
-    return f"postgresql://{user}:{password}@{host}:{port}/{db}"
+    """Get database URL from DB_CONFIG; DATABASE_URL overrides the Postgres settings"""
+    if DB_CONFIG.get('url'):
+        return DB_CONFIG['url']
+    return (f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}"
+            f"@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}")
+
+def get_engine():
+    """Return the process-wide pooled engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        with _init_lock:
+            if _engine is None:
+                url = get_database_url()
+                options = {'echo': DB_CONFIG['echo'], 'pool_pre_ping': True}
+                if not url.startswith('sqlite'):
+                    options.update(
+                        pool_size=DB_CONFIG['pool_size'],
+                        max_overflow=DB_CONFIG['max_overflow'],
+                        pool_timeout=DB_CONFIG['pool_timeout'],
+                        pool_recycle=DB_CONFIG['pool_recycle']
+                    )
+                _engine = create_engine(url, **options)
+                logger.info("Database engine created with connection pooling")
+    return _engine
+
+def get_session_factory():
+    """Return the sessionmaker bound to the shared engine"""
+    global _session_factory
+    if _session_factory is None:
+        # get_engine() takes _init_lock itself, so resolve it before locking
+        engine = get_engine()
+        with _init_lock:
+            if _session_factory is None:
+                _session_factory = sessionmaker(
+                    bind=engine,
+                    autocommit=False,
+                    autoflush=True,
+                    expire_on_commit=False
+                )
+    return _session_factory
 
 def wait_for_db(max_retries=5, retry_interval=2):
     """Wait for database to be ready"""
-    engine = create_engine(get_database_url())
+    engine = get_engine()
     for attempt in range(max_retries):
         try:
-            engine.connect()
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
             logger.info("Database connection successful")
             return True
         except OperationalError as e:
@@ -36,43 +72,19 @@ def wait_for_db(max_retries=5, retry_interval=2):
                 logger.error(f"Could not connect to database after {max_retries} attempts")
                 raise
 
+def require_schema():
+    """Fail fast with a clear message when the tables have not been created yet"""
+    if not inspect(get_engine()).has_table('papers'):
+        raise RuntimeError("Database schema is missing; run 'python src/init_db.py' first")
+
 def init_db():
-    """Initialize database tables"""
-    engine = create_engine(get_database_url())
+    """Create any missing tables straight from the models (tests and throwaway databases)"""
+    wait_for_db()
+    engine = get_engine()
     Base.metadata.create_all(engine)
     logger.info("Database tables initialized")
-
-# Wait for database to be ready
-wait_for_db()
-
-# Create a single engine instance with connection pooling
-engine = create_engine(
-    get_database_url(),
-    poolclass=QueuePool,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_recycle=1800,
-    echo=True  # Enable SQL logging
-)
-logger.info("Database engine created with connection pooling")
-
-# Initialize database tables
-init_db()
-
-# Create a session factory with scoped sessions
-Session = scoped_session(
-    sessionmaker(
-        bind=engine,
-        autocommit=False,
-        autoflush=True,
-        expire_on_commit=False
-    )
-)
-logger.info("Session factory created")
+    return engine
 
 def get_session():
-    """Get a new database session"""
-    engine = create_engine(get_database_url())
-    Session = sessionmaker(bind=engine)
-    return Session() 
\ No newline at end of file
+    """Get a new database session from the shared connection pool"""
+    return get_session_factory()()
@@ -0,0 +1,140 @@
+import os
+import socket
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Collection, Iterable, List, Optional
+from sqlalchemy import or_, select, update
+from database.checkpoints import CheckpointStore, STATUS_FAILED, STATUS_IN_PROGRESS, STATUS_PENDING
+from database.models import CrawlState
+from database.session import get_engine
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """Hands out crawl_state units to crawler processes sharing one database.
+
+    A unit is claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``, so concurrent
+    workers never pick the same row, and leased to the worker for
+    ``lease_seconds``. A heartbeat thread keeps the leases of running units
+    alive; units whose worker died are claimable again once their lease
+    lapses and resume from their last checkpoint. Failed units are never
+    claimed again; ``failed`` lists them so the run can report them. SQLite
+    ignores the row locks, which is fine for a single local worker.
+    """
+
+    def __init__(self, session, worker_id: Optional[str] = None, lease_seconds: float = 300.0):
+        self.session = session
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.checkpoints = CheckpointStore(session)
+        self._seeded: List[int] = []
+
+    def seed(self, units: Iterable[tuple]) -> int:
+        """Make sure a crawl_state row exists for every (query, topic, year) unit"""
+        for query, topic, year in units:
+            self._seeded.append(self.checkpoints.load(query, topic, year).id)
+        return len(self._seeded)
+
+    def failed(self) -> List[CrawlState]:
+        """Seeded units left failed, by this worker or any other"""
+        if not self._seeded:
+            return []
+        states = (
+            self.session.query(CrawlState)
+            .filter(CrawlState.id.in_(self._seeded), CrawlState.status == STATUS_FAILED)
+            .order_by(CrawlState.id)
+            .all()
+        )
+        self.session.commit()
+        return states
+
+    def _lease_expiry(self) -> datetime:
+        return datetime.utcnow() + timedelta(seconds=self.lease_seconds)
+
+    def claim(self, exclude: Collection[int] = ()) -> Optional[CrawlState]:
+        """Lease the next pending or abandoned unit, or return None when none is left.
+
+        Units whose ids are in ``exclude``, e.g. those this worker already
+        stopped early because of ``max_results``, are not handed out again.
+        """
+        now = datetime.utcnow()
+        stmt = (
+            select(CrawlState)
+            .where(
+                CrawlState.status.in_([STATUS_PENDING, STATUS_IN_PROGRESS]),
+                or_(CrawlState.lease_expires_at.is_(None), CrawlState.lease_expires_at < now),
+                CrawlState.id.notin_(exclude)
+            )
+            .order_by(CrawlState.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        try:
+            state = self.session.execute(stmt).scalar_one_or_none()
+            if state is None:
+                self.session.rollback()
+                return None
+            if state.lease_owner and state.lease_owner != self.worker_id:
+                logger.warning(f"Taking over {state} from {state.lease_owner}, whose lease expired")
+            state.lease_owner = self.worker_id
+            state.lease_expires_at = self._lease_expiry()
+            state.status = STATUS_IN_PROGRESS
+            self.session.commit()
+        except Exception as e:
+            logger.error(f"Error claiming a unit of work: {e}")
+            self.session.rollback()
+            raise
+        logger.info(f"Worker {self.worker_id} claimed {state}")
+        return state
+
+    def renew(self) -> int:
+        """Extend the leases of every unit held by this worker; returns how many"""
+        stmt = (
+            update(CrawlState)
+            .where(CrawlState.lease_owner == self.worker_id)
+            .values(lease_expires_at=self._lease_expiry())
+        )
+        # Own connection, so renewals never interleave with the crawl's session
+        with get_engine().begin() as conn:
+            return conn.execute(stmt).rowcount
+
+    def release(self, state_id: int, status: Optional[str] = None):
+        """Give up the lease on a unit, leaving its status as the crawl set it unless ``status`` is given"""
+        values = {'lease_owner': None, 'lease_expires_at': None}
+        if status is not None:
+            values['status'] = status
+        stmt = (
+            update(CrawlState)
+            .where(CrawlState.id == state_id, CrawlState.lease_owner == self.worker_id)
+            .values(**values)
+        )
+        with get_engine().begin() as conn:
+            conn.execute(stmt)
+
+    @contextmanager
+    def heartbeat(self, interval: Optional[float] = None):
+        """Renew this worker's leases in the background while the block runs"""
+        interval = interval or self.lease_seconds / 3
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    self.renew()
+                except Exception as e:
+                    logger.warning(f"Lease heartbeat failed: {e}")
+
+        thread = threading.Thread(target=beat, name='lease-heartbeat', daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            stop.set()
+            thread.join()
@@ -0,0 +1,193 @@
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from database.models import Author, Paper, PaperAuthor, PaperField
+from crawler.dedup import SeenSet
+from crawler.records import PaperRecord
+from crawler.utils.logger import setup_logger
+from crawler.utils.metrics import DB_FLUSH_SECONDS, PAPERS_SKIPPED, PAPERS_STORED
+
+logger = setup_logger(__name__)
+
+PAPER_COLUMNS = ('paper_id', 'doi', 'title', 'authors', 'abstract', 'year', 'citations', 'url', 'topic')
+
+_INSERT_BY_DIALECT = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+class BatchResult:
+    """Outcome of a single flush"""
+
+    def __init__(self, inserted: int = 0, skipped: int = 0):
+        self.inserted = inserted
+        self.skipped = skipped
+
+    def __add__(self, other: 'BatchResult') -> 'BatchResult':
+        return BatchResult(self.inserted + other.inserted, self.skipped + other.skipped)
+
+    def __repr__(self):
+        return f"<BatchResult(inserted={self.inserted}, skipped={self.skipped})>"
+
+
+class PaperBatchWriter:
+    """Accumulates papers and writes them with one INSERT ... ON CONFLICT per batch.
+
+    A batch is flushed when it holds ``batch_size`` papers, when ``flush_interval``
+    seconds have passed since the last flush, or when ``flush()`` is called.
+    Papers already stored, matched on their Semantic Scholar id or normalized
+    title hash, are skipped; given a ``seen`` set, known papers are
+    dropped in ``add`` before they ever reach the database. Authors and fields
+    of study of the written papers go into authors, paper_authors and
+    paper_fields in the same transaction, a few multi-row statements per batch.
+    """
+
+    def __init__(self, session, batch_size: int = 500, flush_interval: float = 5.0, seen: Optional[SeenSet] = None):
+        self.session = session
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.seen = seen
+        self.totals = BatchResult()
+        # Records are kept as-is; insert rows are only built at flush time
+        self._pending: Dict[int, PaperRecord] = {}
+        self._received = 0
+        # Batches written by add() since the last flush(), reported in its result
+        self._carried = BatchResult()
+        self._last_flush = time.monotonic()
+
+    def __len__(self):
+        return self._received
+
+    def add(self, paper: PaperRecord):
+        """Queue a paper; a full batch is written at once and counted in the next ``flush()`` result"""
+        self._received += 1
+        if self.seen is not None:
+            if self.seen.contains(paper):
+                return
+            self.seen.add(paper)
+        # Later copies of the same title within a batch replace earlier ones
+        self._pending[paper.title_hash] = paper
+        if self._received >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self._carried = self._carried + self._write_batch()
+
+    def _insert(self, table):
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in _INSERT_BY_DIALECT:
+            raise RuntimeError(f"Bulk upsert is not supported for dialect '{dialect}'")
+        return _INSERT_BY_DIALECT[dialect](table)
+
+    @staticmethod
+    def _row(paper: PaperRecord) -> Dict:
+        row = {column: getattr(paper, column) for column in PAPER_COLUMNS}
+        row['title_hash'] = paper.title_hash
+        return row
+
+    def _build_statement(self, rows: List[Dict]):
+        stmt = self._insert(Paper).values(rows).on_conflict_do_nothing()
+        return stmt.returning(Paper.id, Paper.title_hash)
+
+    def _resolve_authors(self, authors: Iterable[Tuple[Optional[str], str]]) -> Dict[Tuple, int]:
+        """Ensure author rows exist; maps ('id', s2_author_id) or ('name', name) to authors.id"""
+        with_ids = {}
+        names_only = set()
+        for s2_id, name in authors:
+            if s2_id:
+                with_ids[s2_id] = name
+            else:
+                names_only.add(name)
+        resolved = {}
+        if with_ids:
+            self.session.execute(
+                self._insert(Author)
+                .values([{'s2_author_id': s2_id, 'name': name} for s2_id, name in with_ids.items()])
+                .on_conflict_do_nothing(index_elements=[Author.s2_author_id])
+            )
+            rows = self.session.execute(
+                select(Author.id, Author.s2_author_id).where(Author.s2_author_id.in_(list(with_ids)))
+            )
+            resolved.update({('id', s2_id): author_id for author_id, s2_id in rows})
+        if names_only:
+            rows = self.session.execute(
+                select(Author.id, Author.name).where(Author.s2_author_id.is_(None), Author.name.in_(list(names_only)))
+            )
+            resolved.update({('name', name): author_id for author_id, name in rows})
+            missing = [name for name in names_only if ('name', name) not in resolved]
+            if missing:
+                rows = self.session.execute(
+                    self._insert(Author).values([{'name': name} for name in missing]).returning(Author.id, Author.name)
+                )
+                resolved.update({('name', name): author_id for author_id, name in rows})
+        return resolved
+
+    def _write_relations(self, written: List[Tuple[int, int]]):
+        """Insert paper_authors and paper_fields rows for the papers just written"""
+        authorships = []
+        field_rows = []
+        for paper_pk, paper_title_hash in written:
+            paper = self._pending[paper_title_hash]
+            authorships.extend((paper_pk, position, author) for position, author in enumerate(paper.author_list))
+            field_rows.extend({'paper_id': paper_pk, 'field': field} for field in dict.fromkeys(paper.fields_of_study))
+        if authorships:
+            author_ids = self._resolve_authors(author for _, _, author in authorships)
+            links = {}
+            for paper_pk, position, author in authorships:
+                s2_id, name = author
+                key = ('id', s2_id) if s2_id else ('name', name)
+                # An author listed twice on one paper keeps their first position
+                links.setdefault((paper_pk, author_ids[key]), position)
+            self.session.execute(
+                self._insert(PaperAuthor)
+                .values([{'paper_id': paper_pk, 'author_id': author_id, 'position': position}
+                         for (paper_pk, author_id), position in links.items()])
+                .on_conflict_do_nothing()
+            )
+        if field_rows:
+            self.session.execute(self._insert(PaperField).values(field_rows).on_conflict_do_nothing())
+
+    def flush(self, progress: Optional[Callable[[BatchResult], None]] = None) -> BatchResult:
+        """Write all pending papers in one transaction; returns everything written since the last flush()
+
+        ``progress`` is called with that result just before the commit; a
+        checkpoint it stages in the session is committed together with the
+        papers, or rolled back with them if the write fails.
+        """
+        carried, self._carried = self._carried, BatchResult()
+        return self._write_batch(carried, progress)
+
+    def _write_batch(self, carried: Optional[BatchResult] = None,
+                     progress: Optional[Callable[[BatchResult], None]] = None) -> BatchResult:
+        self._last_flush = time.monotonic()
+        received = self._received
+        rows = [self._row(paper) for paper in self._pending.values()]
+        try:
+            with DB_FLUSH_SECONDS.time():
+                written = 0
+                if rows:
+                    returned = self.session.execute(self._build_statement(rows)).fetchall()
+                    self._write_relations(returned)
+                    written = len(returned)
+                batch = BatchResult(inserted=written, skipped=received - written)
+                result = carried + batch if carried is not None else batch
+                if progress is not None:
+                    progress(result)
+                if rows or progress is not None:
+                    self.session.commit()
+        except Exception as e:
+            logger.error(f"Error flushing batch of {len(rows)} papers: {e}")
+            self.session.rollback()
+            if self.seen is not None:
+                # Let a retry of these papers through the seen set again
+                for paper in self._pending.values():
+                    self.seen.discard(paper)
+            raise
+        finally:
+            self._pending.clear()
+            self._received = 0
+        self.totals = self.totals + batch
+        PAPERS_STORED.inc(batch.inserted)
+        PAPERS_SKIPPED.inc(batch.skipped)
+        if rows:
+            logger.info(f"Flushed batch: {batch.inserted} inserted, {batch.skipped} skipped")
+        return result
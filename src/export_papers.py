@@ -0,0 +1,43 @@
+import argparse
+from pathlib import Path
+from config.settings import CRAWLER_CONFIG
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Export stored papers to a year/topic partitioned Parquet or Arrow dataset')
+    parser.add_argument('--output-dir', type=Path, default=CRAWLER_CONFIG['export_dir'],
+                        help='Dataset directory; also holds the watermark of the last export')
+    parser.add_argument('--format', choices=['arrow', 'parquet'], default=CRAWLER_CONFIG['export_format'],
+                        help='File format (default: %(default)s)')
+    parser.add_argument('--compression', choices=['none', 'gzip', 'zstd'], default=CRAWLER_CONFIG['export_compression'] or 'none',
+                        help='Codec; none still uses the format default (snappy or lz4)')
+    parser.add_argument('--batch-size', type=int, default=CRAWLER_CONFIG['export_batch_size'],
+                        help='Papers per row group and per database fetch')
+    parser.add_argument('--full', action='store_true',
+                        help='Ignore the watermark and export every paper; use with an empty --output-dir')
+    args = parser.parse_args()
+
+    from database.export import PaperExporter
+    from database.session import get_session
+
+    session = get_session()
+    try:
+        exporter = PaperExporter(
+            session,
+            output_dir=args.output_dir,
+            file_format=args.format,
+            compression=None if args.compression == 'none' else args.compression,
+            batch_size=args.batch_size
+        )
+        result = exporter.run(full=args.full)
+        print(f"\nExported {result.rows} papers into {result.files} files under {args.output_dir}")
+    except Exception as e:
+        logger.error(f"Error exporting papers: {e}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    main()
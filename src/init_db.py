@@ -1,16 +1,33 @@
-from src.database.session import init_db
-from src.crawler.utils.logger import setup_logger
+import argparse
+from pathlib import Path
+from crawler.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+ALEMBIC_INI = Path(__file__).parent / 'alembic.ini'
+
 def main():
+    parser = argparse.ArgumentParser(description='Create or upgrade the database schema')
+    parser.add_argument('--revision', default='head', help='Alembic revision to upgrade to (default: head)')
+    args = parser.parse_args()
+
+    from alembic import command
+    from alembic.config import Config
+    from database.session import wait_for_db
+
     try:
         logger.info("Initializing database...")
-        engine = init_db()
+        wait_for_db()
+        config = Config(str(ALEMBIC_INI))
+        config.set_main_option('script_location', str(ALEMBIC_INI.parent / 'migrations'))
+        # Keep the crawler's log handlers instead of alembic.ini's
+        config.attributes['configure_logger'] = False
+        # The first revision creates every table on an empty database
+        command.upgrade(config, args.revision)
         logger.info("Database initialized successfully!")
     except Exception as e:
         logger.error(f"Error initializing database: {e}")
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
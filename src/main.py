@@ -1,21 +1,36 @@
 import argparse
-import logging
+from contextlib import nullcontext
 from pathlib import Path
-from crawler.scholar_crawler import ScholarCrawler
-from config.settings import MATH_TOPICS, CRAWLER_CONFIG
+from crawler.cache import CACHE_MODES
+from config.settings import CRAWLER_CONFIG
 from crawler.utils.logger import setup_logger
+from crawler.utils.metrics import start_exporters
+from crawler.utils.profiling import profiled
 
 logger = setup_logger(__name__)
 
 def main():
     parser = argparse.ArgumentParser(description='Crawl academic papers from Semantic Scholar')
     parser.add_argument('--year', type=int, help='Year to filter papers')
+    parser.add_argument('--year-end', type=int, help='Last year of the range to crawl')
     parser.add_argument('--topic', type=str, help='Math topic to filter papers')
     parser.add_argument('--max-results', type=int, help='Maximum number of results to fetch')
+    parser.add_argument('--bulk', action='store_true', help='Use bulk search with batch hydration instead of relevance search')
+    parser.add_argument('--restart', action='store_true', help='Ignore saved checkpoints and crawl from the first page')
+    parser.add_argument('--cache-mode', choices=CACHE_MODES, default=CRAWLER_CONFIG['cache_mode'],
+                        help='API response cache: off, read-through, or offline (replay cached responses only)')
+    parser.add_argument('--profile', type=Path, metavar='PATH',
+                        help='Profile the crawl with cProfile and write pstats output to PATH')
     args = parser.parse_args()
 
+    # Imported after argument parsing so --help never loads SQLAlchemy or the API client
+    from crawler.scholar_crawler import ScholarCrawler
+
+    metrics_dumper = start_exporters(CRAWLER_CONFIG['metrics_port'], CRAWLER_CONFIG['metrics_json_path'],
+                                     CRAWLER_CONFIG['metrics_interval'])
+
     # Initialize crawler
-    crawler = ScholarCrawler()
+    crawler = ScholarCrawler(cache_mode=args.cache_mode)
     
     # Set up filters
     year = args.year or CRAWLER_CONFIG['year_range']['start']
@@ -24,15 +39,30 @@ def main():
 
     # Crawl papers
     try:
-        stored_count = crawler.crawl_math_papers(
-            topic=topic,
-            year=year,
-            max_results=max_results
-        )
+        with profiled(args.profile) if args.profile else nullcontext():
+            if args.bulk:
+                stored_count = crawler.bulk_crawl(
+                    topic=topic,
+                    year=year,
+                    year_end=args.year_end,
+                    max_results=max_results,
+                    resume=not args.restart
+                )
+            else:
+                stored_count = crawler.crawl_math_papers(
+                    topic=topic,
+                    year=year,
+                    year_end=args.year_end,
+                    max_results=max_results,
+                    resume=not args.restart
+                )
         logger.info(f"Successfully processed {stored_count} papers")
     except Exception as e:
         logger.error(f"Error during crawling: {e}")
         raise
+    finally:
+        if metrics_dumper is not None:
+            metrics_dumper.stop()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,52 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import create_engine, pool
+from database.models import Base
+from database.session import get_database_url
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get('configure_logger', True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Created by DDL on Postgres only (see database.models), so absent from the metadata
+UNMAPPED = {'search_vector', 'idx_papers_search_vector'}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return name not in UNMAPPED
+
+
+def run_migrations_offline():
+    """Emit the migration SQL without connecting to a database"""
+    context.configure(url=get_database_url(), target_metadata=target_metadata, include_object=include_object,
+                      literal_binds=True, dialect_opts={'paramstyle': 'named'})
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run(connection):
+    # Batch mode lets SQLite emulate ALTER TABLE by copying the table
+    context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object,
+                      render_as_batch=connection.dialect.name == 'sqlite')
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    # A caller such as a test may pass its own connection instead of DATABASE_URL
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        _run(connection)
+        return
+    engine = create_engine(get_database_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        _run(connection)
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
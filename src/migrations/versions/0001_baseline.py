@@ -0,0 +1,180 @@
+"""Baseline: bring any pre-Alembic database up to the crawler schema
+
+Databases created by init_db() before migrations existed may date from any
+earlier release, so every step checks what is already there. On a fresh
+database this creates the papers, crawl_state and rate_budget tables.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+import hashlib
+import re
+import unicodedata
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+
+
+def _title_hash(title):
+    # Frozen copy of crawler.dedup.title_hash, so later changes there cannot alter this migration
+    normalized = _NON_WORD.sub(' ', unicodedata.normalize('NFKC', title or '').casefold()).strip()
+    digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+def _columns(inspector, table):
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def _indexes(inspector, table):
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def _create_index(inspector, name, table, columns, unique=False):
+    if name not in _indexes(inspector, table):
+        op.create_index(name, table, columns, unique=unique)
+
+
+# Collision groups spelled out in the error of a failed backfill
+MAX_LISTED_COLLISIONS = 20
+
+
+def _backfill_title_hashes(bind):
+    """Hash the titles of papers stored before title_hash existed.
+
+    title_hash is unique, so titles that only differ after normalization
+    cannot both stay. Rather than pick a winner, the migration stops and lists
+    them for an operator to merge or delete.
+    """
+    papers = sa.table('papers', sa.column('id', sa.Integer), sa.column('title', sa.String),
+                      sa.column('title_hash', sa.BigInteger))
+    groups = {}
+    for paper_id, title, value in bind.execute(sa.select(papers.c.id, papers.c.title, papers.c.title_hash)):
+        groups.setdefault(value if value is not None else _title_hash(title), []).append((paper_id, title))
+    collisions = [sorted(group) for group in groups.values() if len(group) > 1]
+    if collisions:
+        collisions.sort()
+        listed = '\n'.join(
+            '  ' + ', '.join(f"id {paper_id}: {title!r}" for paper_id, title in group)
+            for group in collisions[:MAX_LISTED_COLLISIONS]
+        )
+        more = len(collisions) - MAX_LISTED_COLLISIONS
+        raise RuntimeError(
+            f"{sum(len(group) for group in collisions)} papers in {len(collisions)} groups have titles that are "
+            f"equal after normalization and cannot share the unique title_hash. Merge or delete all but one "
+            f"paper of each group, then run 'python src/init_db.py' again:\n{listed}"
+            + (f"\n  ... and {more} more groups" if more > 0 else '')
+        )
+    rows = bind.execute(sa.select(papers.c.id, papers.c.title).where(papers.c.title_hash.is_(None))).fetchall()
+    if rows:
+        bind.execute(
+            papers.update().where(papers.c.id == sa.bindparam('paper_pk')).values(title_hash=sa.bindparam('hash')),
+            [{'paper_pk': paper_id, 'hash': _title_hash(title)} for paper_id, title in rows]
+        )
+
+
+def _upgrade_papers(bind, inspector):
+    if not inspector.has_table('papers'):
+        op.create_table(
+            'papers',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('paper_id', sa.String(40), unique=True),
+            sa.Column('doi', sa.String),
+            sa.Column('title', sa.String, nullable=False),
+            sa.Column('title_hash', sa.BigInteger, nullable=False),
+            sa.Column('authors', sa.String),
+            sa.Column('abstract', sa.String),
+            sa.Column('year', sa.Integer),
+            sa.Column('citations', sa.Integer),
+            sa.Column('url', sa.String),
+            sa.Column('created_at', sa.DateTime),
+            sa.Column('updated_at', sa.DateTime),
+            sa.Column('refreshed_at', sa.DateTime),
+            sa.Column('citation_velocity', sa.Float, nullable=False, server_default='0'),
+        )
+    else:
+        existing = _columns(inspector, 'papers')
+        missing = [
+            sa.Column('paper_id', sa.String(40)),
+            sa.Column('doi', sa.String),
+            sa.Column('title_hash', sa.BigInteger),
+            sa.Column('updated_at', sa.DateTime),
+            sa.Column('refreshed_at', sa.DateTime),
+            sa.Column('citation_velocity', sa.Float, nullable=False, server_default='0'),
+        ]
+        with op.batch_alter_table('papers') as batch:
+            for column in missing:
+                if column.name not in existing:
+                    batch.add_column(column)
+        # Also finishes a backfill that stopped on title collisions in an earlier attempt
+        _backfill_title_hashes(bind)
+        if bind.dialect.name == 'postgresql':
+            op.alter_column('papers', 'title_hash', nullable=False)
+            # Exact-title uniqueness was replaced by the normalized title hash
+            op.execute("ALTER TABLE papers DROP CONSTRAINT IF EXISTS papers_title_key")
+        if 'paper_id' not in existing:
+            op.create_index('uq_papers_paper_id', 'papers', ['paper_id'], unique=True)
+    inspector.clear_cache()
+    _create_index(inspector, 'idx_papers_title', 'papers', ['title'])
+    _create_index(inspector, 'idx_papers_title_hash', 'papers', ['title_hash'], unique=True)
+    _create_index(inspector, 'idx_papers_doi', 'papers', ['doi'])
+    _create_index(inspector, 'idx_papers_year', 'papers', ['year'])
+    _create_index(inspector, 'idx_papers_citations', 'papers', ['citations'])
+    _create_index(inspector, 'idx_papers_refreshed_at', 'papers', ['refreshed_at'])
+
+
+def _upgrade_crawl_state(inspector):
+    if not inspector.has_table('crawl_state'):
+        op.create_table(
+            'crawl_state',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('query', sa.String, nullable=False),
+            sa.Column('topic', sa.String),
+            sa.Column('year', sa.Integer),
+            sa.Column('offset', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('token', sa.String),
+            sa.Column('status', sa.String, nullable=False, server_default='pending'),
+            sa.Column('papers_stored', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('requests', sa.Integer, nullable=False, server_default='0'),
+            sa.Column('lease_owner', sa.String),
+            sa.Column('lease_expires_at', sa.DateTime),
+            sa.Column('created_at', sa.DateTime),
+            sa.Column('updated_at', sa.DateTime),
+            sa.UniqueConstraint('query', 'year', name='uq_crawl_state_query_year'),
+        )
+    else:
+        existing = _columns(inspector, 'crawl_state')
+        with op.batch_alter_table('crawl_state') as batch:
+            for column in (sa.Column('token', sa.String), sa.Column('lease_owner', sa.String),
+                           sa.Column('lease_expires_at', sa.DateTime)):
+                if column.name not in existing:
+                    batch.add_column(column)
+    inspector.clear_cache()
+    _create_index(inspector, 'idx_crawl_state_status', 'crawl_state', ['status'])
+    _create_index(inspector, 'idx_crawl_state_lease_owner', 'crawl_state', ['lease_owner'])
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    _upgrade_papers(bind, inspector)
+    _upgrade_crawl_state(inspector)
+    if not inspector.has_table('rate_budget'):
+        op.create_table(
+            'rate_budget',
+            sa.Column('name', sa.String, primary_key=True),
+            sa.Column('tokens', sa.Float, nullable=False),
+            sa.Column('updated_at', sa.Float, nullable=False),
+        )
+
+
+def downgrade():
+    # The baseline adopts existing data; there is no earlier revision to return to
+    pass
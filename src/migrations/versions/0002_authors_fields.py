@@ -0,0 +1,98 @@
+"""Normalized authors and fields of study
+
+Adds authors, paper_authors and paper_fields, and backfills name-only
+authors from the comma-separated papers.authors column. Fields of study
+were never stored before this revision, so only papers written after it
+have them.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK = 5000
+
+papers = sa.table('papers', sa.column('id', sa.Integer), sa.column('authors', sa.String))
+authors = sa.table('authors', sa.column('id', sa.Integer), sa.column('s2_author_id', sa.String),
+                   sa.column('name', sa.String))
+paper_authors = sa.table('paper_authors', sa.column('paper_id', sa.Integer), sa.column('author_id', sa.Integer),
+                         sa.column('position', sa.Integer))
+
+
+def _backfill_authors(bind):
+    """Link every paper to name-only authors parsed from papers.authors, a chunk of papers at a time"""
+    author_ids = {name: author_id for author_id, name in bind.execute(
+        sa.select(authors.c.id, authors.c.name).where(authors.c.s2_author_id.is_(None))
+    )}
+    linked = sa.select(paper_authors.c.paper_id).where(paper_authors.c.paper_id == papers.c.id).exists()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(papers.c.id, papers.c.authors)
+            .where(papers.c.id > last_id, papers.c.authors.isnot(None), papers.c.authors != '', ~linked)
+            .order_by(papers.c.id)
+            .limit(BACKFILL_CHUNK)
+        ).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        bylines = [(paper_id, [name.strip() for name in text.split(', ') if name.strip()]) for paper_id, text in rows]
+        new_names = sorted({name for _, names in bylines for name in names if name not in author_ids})
+        if new_names:
+            bind.execute(authors.insert(), [{'name': name} for name in new_names])
+            author_ids.update({name: author_id for author_id, name in bind.execute(
+                sa.select(authors.c.id, authors.c.name)
+                .where(authors.c.s2_author_id.is_(None), authors.c.name.in_(new_names))
+            )})
+        links = []
+        for paper_id, names in bylines:
+            used = set()
+            for position, name in enumerate(names):
+                # A name listed twice on one paper is one author row and one link
+                if author_ids[name] not in used:
+                    used.add(author_ids[name])
+                    links.append({'paper_id': paper_id, 'author_id': author_ids[name], 'position': position})
+        if links:
+            bind.execute(paper_authors.insert(), links)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('authors'):
+        op.create_table(
+            'authors',
+            sa.Column('id', sa.Integer, primary_key=True),
+            sa.Column('s2_author_id', sa.String(20), unique=True),
+            sa.Column('name', sa.String, nullable=False),
+        )
+        op.create_index('idx_authors_name', 'authors', ['name'])
+    if not inspector.has_table('paper_authors'):
+        op.create_table(
+            'paper_authors',
+            sa.Column('paper_id', sa.Integer, sa.ForeignKey('papers.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('author_id', sa.Integer, sa.ForeignKey('authors.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('position', sa.Integer, nullable=False),
+        )
+        op.create_index('idx_paper_authors_author_id', 'paper_authors', ['author_id', 'paper_id'])
+    if not inspector.has_table('paper_fields'):
+        op.create_table(
+            'paper_fields',
+            sa.Column('paper_id', sa.Integer, sa.ForeignKey('papers.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('field', sa.String, primary_key=True),
+        )
+        op.create_index('idx_paper_fields_field', 'paper_fields', ['field', 'paper_id'])
+    _backfill_authors(bind)
+
+
+def downgrade():
+    op.drop_table('paper_fields')
+    op.drop_table('paper_authors')
+    op.drop_table('authors')
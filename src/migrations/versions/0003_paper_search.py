@@ -0,0 +1,46 @@
+"""Full-text search over titles and abstracts
+
+Adds the generated search_vector column and its GIN index on Postgres and
+drops idx_papers_title: lookups by title go through idx_papers_title_hash,
+so the B-tree over the full title only slowed down inserts.
+
+Adding a stored generated column rewrites the papers table once; on a large
+database run this revision while no crawler is writing.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# Frozen copies of database.models.SEARCH_VECTOR_DDL and SEARCH_INDEX_DDL
+SEARCH_VECTOR_DDL = (
+    "ALTER TABLE papers ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(abstract, '')), 'B')"
+    ") STORED"
+)
+SEARCH_INDEX_DDL = "CREATE INDEX IF NOT EXISTS idx_papers_search_vector ON papers USING GIN (search_vector)"
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(SEARCH_VECTOR_DDL)
+        op.execute(SEARCH_INDEX_DDL)
+    if 'idx_papers_title' in {index['name'] for index in sa.inspect(bind).get_indexes('papers')}:
+        op.drop_index('idx_papers_title', table_name='papers')
+
+
+def downgrade():
+    op.create_index('idx_papers_title', 'papers', ['title'])
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS idx_papers_search_vector")
+        op.execute("ALTER TABLE papers DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,31 @@
+"""Topic label and created_at index for partitioned exports
+
+Papers stored before this revision have no topic and are exported to the
+default topic partition.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'topic' not in {column['name'] for column in inspector.get_columns('papers')}:
+        with op.batch_alter_table('papers') as batch:
+            batch.add_column(sa.Column('topic', sa.String))
+    if 'idx_papers_created_at' not in {index['name'] for index in inspector.get_indexes('papers')}:
+        op.create_index('idx_papers_created_at', 'papers', ['created_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('idx_papers_created_at', table_name='papers')
+    with op.batch_alter_table('papers') as batch:
+        batch.drop_column('topic')
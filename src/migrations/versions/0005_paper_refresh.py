@@ -0,0 +1,29 @@
+"""Refresh log kept outside the papers table
+
+paper_refresh records when each paper's citation count was last re-fetched,
+so the refresh job only writes papers whose count actually changed.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('paper_refresh'):
+        op.create_table(
+            'paper_refresh',
+            sa.Column('paper_id', sa.Integer, sa.ForeignKey('papers.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('checked_at', sa.DateTime, nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table('paper_refresh')
@@ -0,0 +1,32 @@
+import argparse
+from config.settings import CRAWLER_CONFIG
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Refresh citation counts of stored papers')
+    parser.add_argument('--max-papers', type=int, help='Stop after checking this many papers')
+    parser.add_argument('--batch-size', type=int, default=CRAWLER_CONFIG['refresh_batch_size'],
+                        help='Papers re-fetched per batch request (at most 500)')
+    parser.add_argument('--min-age-days', type=float, default=CRAWLER_CONFIG['refresh_min_age_days'],
+                        help='Only refresh papers not refreshed for this many days')
+    args = parser.parse_args()
+
+    # Imported after argument parsing so --help and bad arguments return immediately
+    from crawler.refresh import CitationRefresher
+    from database.session import get_session
+
+    session = get_session()
+    try:
+        refresher = CitationRefresher(session, batch_size=args.batch_size, min_age_days=args.min_age_days)
+        result = refresher.run(max_papers=args.max_papers)
+        print(f"\nChecked {result.checked} papers: {result.changed} citation counts changed, {result.missing} not found")
+    except Exception as e:
+        logger.error(f"Error refreshing citations: {e}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,136 @@
+import argparse
 import os
-import time
-from crawler.scholar_crawler import ScholarCrawler
-from config.settings import MATH_TOPICS
+from config.settings import CRAWLER_CONFIG, MATH_TOPICS
 from crawler.utils.logger import setup_logger
+from crawler.utils.metrics import start_exporters
 
 logger = setup_logger(__name__)
 
+def run_sequential(year, year_end, max_results, resume):
+    """Crawl every topic and year one after another"""
+    from crawler.scholar_crawler import ScholarCrawler
+
+    # Initialize crawler
+    crawler = ScholarCrawler()
+    
+    total_papers = 0
+    for current_year in range(year, year_end + 1):
+        for topic in MATH_TOPICS:
+            try:
+                logger.info(f"Processing topic: {topic} ({current_year})")
+                papers_count = crawler.crawl_math_papers(
+                    topic=topic,
+                    year=current_year,
+                    max_results=max_results,
+                    resume=resume
+                )
+                total_papers += papers_count
+                logger.info(f"Completed topic {topic} ({current_year}). Found {papers_count} papers")
+            except Exception as e:
+                logger.error(f"Error processing topic {topic} ({current_year}): {e}")
+                continue
+    
+    return total_papers
+
+def run_concurrent(year, year_end, max_results, concurrency, resume):
+    """Crawl topics x years concurrently with a shared rate limiter and DB writer"""
+    from crawler.async_crawler import run_async_crawl
+
+    stats = run_async_crawl(MATH_TOPICS, year, year_end, concurrency=concurrency, max_results=max_results, resume=resume)
+    return stats['papers_fetched']
+
+def run_queue_worker(year, year_end, max_results):
+    """Claim topic/year units from the shared crawl_state queue until none are left"""
+    from crawler.scholar_crawler import ScholarCrawler, build_search_query
+    from database.checkpoints import STATUS_FAILED
+    from database.work_queue import WorkQueue
+
+    crawler = ScholarCrawler()
+    work_queue = WorkQueue(crawler.session, lease_seconds=CRAWLER_CONFIG['lease_seconds'])
+    # Every worker seeds the same units; existing rows are left alone
+    work_queue.seed(
+        (build_search_query(topic, current_year), topic, current_year)
+        for current_year in range(year, year_end + 1)
+        for topic in MATH_TOPICS
+    )
+    
+    total_papers = 0
+    claimed = set()
+    with work_queue.heartbeat():
+        while True:
+            state = work_queue.claim(exclude=claimed)
+            if state is None:
+                break
+            state_id, topic, current_year = state.id, state.topic, state.year
+            claimed.add(state_id)
+            status = None
+            try:
+                papers_count = crawler.crawl_math_papers(
+                    topic=topic,
+                    year=current_year,
+                    max_results=max_results
+                )
+                total_papers += papers_count
+                logger.info(f"Completed topic {topic} ({current_year}). Found {papers_count} papers")
+            except Exception as e:
+                logger.error(f"Error processing topic {topic} ({current_year}): {e}")
+                # Keep other workers from picking up a unit that fails outright
+                status = STATUS_FAILED
+            finally:
+                work_queue.release(state_id, status)
+    
+    logger.info(f"Worker {work_queue.worker_id} found no more units to claim")
+    failed = work_queue.failed()
+    if failed:
+        # Never claimed again; see "Multi-Node Crawling" in the README for how to retry them
+        logger.warning(f"{len(failed)} units failed and were not retried: "
+                       + ', '.join(f"'{state.query}'" for state in failed))
+    return total_papers
+
+def run_scheduled(year, year_end):
+    """Crawl the topic/year units that promise the most new papers per request within the request budget"""
+    from crawler.scheduler import CrawlScheduler
+    from crawler.scholar_crawler import ScholarCrawler
+
+    scheduler = CrawlScheduler(ScholarCrawler(), MATH_TOPICS, range(year, year_end + 1))
+    stats = scheduler.run()
+    return stats['papers_processed']
+
 def main():
+    # Configured through the environment; parsing still gives --help and rejects stray arguments
+    argparse.ArgumentParser(
+        description='Crawl every math topic for YEAR_START..YEAR_END',
+        epilog='Settings come from environment variables: YEAR_START, YEAR_END, MAX_RESULTS, '
+               'CRAWL_MODE, CRAWL_CONCURRENCY, RESUME, REQUEST_BUDGET, TOPIC_QUOTA (see README)'
+    ).parse_args()
+
     # Get configuration from environment variables
     year = int(os.getenv('YEAR_START', '2000'))
-    year_end = int(os.getenv('YEAR_END', '2000'))
+    year_end = int(os.getenv('YEAR_END', str(year)))
     max_results = int(os.getenv('MAX_RESULTS', '1000')) if os.getenv('MAX_RESULTS') else None
+    crawl_mode = os.getenv('CRAWL_MODE', 'sequential')
+    concurrency = int(os.getenv('CRAWL_CONCURRENCY', '4'))
+    # Completed topic/year units are skipped and partial ones resumed unless RESUME=false
+    resume = os.getenv('RESUME', 'true').lower() not in ('0', 'false', 'no')
     
-    logger.info(f"Starting crawler for year {year} to {year_end} with max_results={max_results}")
+    logger.info(f"Starting {crawl_mode} crawler for year {year} to {year_end} with max_results={max_results}")
+    metrics_dumper = start_exporters(CRAWLER_CONFIG['metrics_port'], CRAWLER_CONFIG['metrics_json_path'],
+                                     CRAWLER_CONFIG['metrics_interval'])
     
-    # Initialize crawler
-    crawler = ScholarCrawler()
-    
-    total_papers = 0
-    for topic in MATH_TOPICS:
-        try:
-            logger.info(f"Processing topic: {topic}")
-            papers_count = crawler.crawl_math_papers(
-                topic=topic,
-                year=year,
-                max_results=max_results
-            )
-            total_papers += papers_count
-            logger.info(f"Completed topic {topic}. Found {papers_count} papers")
-            
-            # Add delay between topics
-            time.sleep(2)
-        except Exception as e:
-            logger.error(f"Error processing topic {topic}: {e}")
-            continue
+    try:
+        if crawl_mode == 'async':
+            total_papers = run_concurrent(year, year_end, max_results, concurrency, resume)
+        elif crawl_mode == 'queue':
+            total_papers = run_queue_worker(year, year_end, max_results)
+        elif crawl_mode == 'scheduled':
+            total_papers = run_scheduled(year, year_end)
+        else:
+            total_papers = run_sequential(year, year_end, max_results, resume)
+    finally:
+        if metrics_dumper is not None:
+            metrics_dumper.stop()
     
     logger.info(f"Crawling completed. Total papers processed: {total_papers}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
@@ -0,0 +1,49 @@
+import argparse
+import json
+from crawler.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description='Full-text search over stored paper titles and abstracts')
+    parser.add_argument('query', help='Search terms; supports "quoted phrases", or, and -excluded terms')
+    parser.add_argument('--year', type=int, help='Earliest publication year')
+    parser.add_argument('--year-end', type=int, help='Latest publication year')
+    parser.add_argument('--min-citations', type=int, help='Only papers with at least this many citations')
+    parser.add_argument('--sort', choices=['rank', 'citations', 'year'], default='rank', help='Result order (default: rank)')
+    parser.add_argument('--limit', type=int, default=20, help='Number of results to show')
+    parser.add_argument('--offset', type=int, default=0, help='Number of results to skip')
+    parser.add_argument('--json', action='store_true', help='Print one JSON object per result')
+    args = parser.parse_args()
+
+    from database.search import PaperSearch
+    from database.session import get_session, require_schema
+
+    require_schema()
+    session = get_session()
+    try:
+        hits = PaperSearch(session).search(
+            args.query,
+            year_from=args.year,
+            year_to=args.year_end,
+            min_citations=args.min_citations,
+            sort=args.sort,
+            limit=args.limit,
+            offset=args.offset
+        )
+    except Exception as e:
+        logger.error(f"Error searching papers (if the schema is out of date, run 'python src/init_db.py' first): {e}")
+        raise
+    finally:
+        session.close()
+
+    for hit in hits:
+        if args.json:
+            print(json.dumps(hit.to_dict(), ensure_ascii=False))
+        else:
+            print(f"{hit.rank:7.4f}  {hit.year or '----'}  {hit.citations or 0:>7}  {hit.title}")
+    if not args.json:
+        print(f"\n{len(hits)} papers")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Settings are read at import time, so point them at a scratch database first
+_WORKDIR = Path(tempfile.mkdtemp(prefix='crawler_tests_'))
+os.environ['DATABASE_URL'] = f"sqlite:///{_WORKDIR / 'test.db'}"
+os.environ['LOG_DIR'] = str(_WORKDIR / 'logs')
+os.environ['CACHE_MODE'] = 'off'
+os.environ['REQUESTS_PER_SECOND'] = '10000'
+os.environ['RATE_BURST'] = '100'
+os.environ['OUTPUT_FORMATS'] = 'jsonl'
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+
+@pytest.fixture(scope='session', autouse=True)
+def database():
+    from database.session import init_db
+    init_db()
+
+
+@pytest.fixture
+def session():
+    from database.session import get_session
+    session = get_session()
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope='session')
+def fake_api():
+    from benchmarks.fake_s2_server import FakeScholarServer
+    with FakeScholarServer(results_per_query=250) as server:
+        yield server
+
+
+@pytest.fixture
+def crawler(fake_api, tmp_path):
+    from crawler.api_client import SemanticScholarClient
+    from crawler.scholar_crawler import ScholarCrawler
+    crawler = ScholarCrawler()
+    crawler.client = SemanticScholarClient(base_url=fake_api.base_url)
+    crawler.data_dir = tmp_path
+    return crawler
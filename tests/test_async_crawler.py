@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from config.settings import CRAWLER_CONFIG
+from crawler.async_crawler import AsyncCrawler, run_async_crawl
+from crawler.dedup import SeenSet
+from crawler.paginator import AsyncSearchPaginator
+from crawler.scholar_crawler import build_search_query
+from database.checkpoints import STATUS_COMPLETED, STATUS_FAILED
+from database.models import CrawlState
+from database.writer import PaperBatchWriter
+
+
+def _state(session, topic, year):
+    session.expire_all()
+    state = session.query(CrawlState).filter_by(query=build_search_query(topic, year), year=year).one()
+    return state.status, state.offset, state.papers_stored
+
+
+def test_failed_write_fails_only_that_unit(fake_api, session, monkeypatch):
+    monkeypatch.setitem(CRAWLER_CONFIG, 'api_base_url', fake_api.base_url)
+    write_relations = PaperBatchWriter._write_relations
+    calls = {'count': 0}
+
+    def flaky_write_relations(self, written):
+        calls['count'] += 1
+        if calls['count'] == 2:
+            raise RuntimeError('database went away')
+        return write_relations(self, written)
+    monkeypatch.setattr(PaperBatchWriter, '_write_relations', flaky_write_relations)
+
+    stats = run_async_crawl(['Geometry', 'Number Theory'], 2005, 2005, concurrency=1)
+
+    assert stats['failed_units'] == 1
+    assert _state(session, 'Geometry', 2005) == (STATUS_FAILED, 100, 100)
+    assert _state(session, 'Number Theory', 2005) == (STATUS_COMPLETED, 250, 250)
+
+    monkeypatch.setattr(PaperBatchWriter, '_write_relations', write_relations)
+    run_async_crawl(['Geometry'], 2005, 2005, concurrency=1)
+    assert _state(session, 'Geometry', 2005) == (STATUS_COMPLETED, 250, 250)
+
+
+def test_unexpected_fetch_error_fails_only_that_unit(fake_api, session, monkeypatch):
+    monkeypatch.setitem(CRAWLER_CONFIG, 'api_base_url', fake_api.base_url)
+    consume = AsyncSearchPaginator._consume
+
+    def malformed(self, response, remaining):
+        if self.query == 'Probability':
+            raise KeyError('data')
+        return consume(self, response, remaining)
+    monkeypatch.setattr(AsyncSearchPaginator, '_consume', malformed)
+
+    stats = run_async_crawl(['Probability', 'Statistics'], 2006, 2006, concurrency=2)
+
+    assert stats['failed_units'] == 1
+    assert _state(session, 'Probability', 2006)[0] == STATUS_FAILED
+    assert _state(session, 'Statistics', 2006) == (STATUS_COMPLETED, 250, 250)
+
+
+def test_writer_startup_error_fails_the_run(fake_api, monkeypatch):
+    monkeypatch.setitem(CRAWLER_CONFIG, 'api_base_url', fake_api.base_url)
+
+    def broken_warm(self, session):
+        raise RuntimeError('cannot read papers')
+    monkeypatch.setattr(SeenSet, 'warm', broken_warm)
+    crawler = AsyncCrawler(concurrency=1, resume=False)
+
+    async def crawl():
+        # A hung run fails here instead of blocking the suite
+        return await asyncio.wait_for(crawler.run(['Algebra', 'Topology'], range(2007, 2009)), timeout=30)
+
+    with pytest.raises(RuntimeError, match='cannot read papers'):
+        asyncio.run(crawl())
@@ -0,0 +1,23 @@
+from database.models import CrawlState, Paper
+from database.checkpoints import STATUS_COMPLETED, STATUS_IN_PROGRESS
+
+
+def _state(session):
+    session.expire_all()
+    state = session.query(CrawlState).filter_by(query='bulk:Combinatorics:2001-2010').one()
+    return state.status, state.offset, state.token, state.papers_stored
+
+
+def test_bulk_crawl_resumes_across_runs_with_small_max_results(crawler, session):
+    # 250 hits per year over ten years: bulk pages of 1000, 1000 and 500 ids
+    crawler.bulk_crawl(topic='Combinatorics', year=2001, year_end=2010, max_results=100)
+    assert _state(session) == (STATUS_IN_PROGRESS, 1000, '1000', 1000)
+
+    crawler.bulk_crawl(topic='Combinatorics', year=2001, year_end=2010, max_results=100)
+    assert _state(session) == (STATUS_IN_PROGRESS, 2000, '2000', 2000)
+
+    crawler.bulk_crawl(topic='Combinatorics', year=2001, year_end=2010, max_results=100)
+    assert _state(session) == (STATUS_COMPLETED, 2500, None, 2500)
+    assert session.query(Paper).filter_by(topic='Combinatorics').count() == 2500
+
+    assert crawler.bulk_crawl(topic='Combinatorics', year=2001, year_end=2010, max_results=100) == 0
@@ -0,0 +1,84 @@
+import pytest
+from crawler import cache as cache_module
+from crawler.api_client import SemanticScholarClient
+from crawler.cache import CACHE_OFFLINE, CacheMiss, ResponseCache
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, 'time', clock.time)
+    return clock
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = ResponseCache(tmp_path / 'responses.db', ttl=60)
+    key = cache.make_key('GET', '/paper/search', {'query': 'Algebra', 'offset': 0})
+    cache.put(key, {'total': 1, 'data': [{'paperId': 'a'}]})
+
+    clock.now += 60
+    assert cache.get(key) == {'total': 1, 'data': [{'paperId': 'a'}]}
+    clock.now += 1
+    assert cache.get(key) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_keys_ignore_parameter_order():
+    first = ResponseCache.make_key('GET', '/paper/search', {'query': 'Algebra', 'offset': 0})
+    second = ResponseCache.make_key('get', '/paper/search', {'offset': 0, 'query': 'Algebra'})
+    assert first == second
+    assert first != ResponseCache.make_key('GET', '/paper/search', {'query': 'Algebra', 'offset': 100})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = ResponseCache(tmp_path / 'responses.db', max_entries=10)
+    for index in range(10):
+        clock.now += 1
+        cache.put(f'key-{index}', {'index': index})
+    # Reading the oldest entry makes key-1 the least recently used
+    clock.now += 1
+    cache.get('key-0')
+    clock.now += 1
+    cache.put('key-10', {'index': 10})
+
+    # Over capacity, the cache trims to 90% of max_entries
+    kept = [index for index in range(11) if cache.get(f'key-{index}') is not None]
+    assert kept == [0, 3, 4, 5, 6, 7, 8, 9, 10]
+
+
+def test_offline_replay_serves_expired_entries_and_fails_on_misses(tmp_path, clock):
+    path = tmp_path / 'responses.db'
+    writer = ResponseCache(path, ttl=60)
+    writer.put('known', {'data': []})
+    writer.close()
+    clock.now += 3600
+
+    offline = ResponseCache(path, ttl=60, mode=CACHE_OFFLINE)
+    assert offline.get('known') == {'data': []}
+    with pytest.raises(CacheMiss):
+        offline.get('unknown')
+
+
+def test_crawler_closes_its_client_after_each_unit_and_can_crawl_again(crawler, fake_api, tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.db')
+    crawler.client = SemanticScholarClient(base_url=fake_api.base_url, cache=cache)
+
+    first = crawler.crawl_math_papers(topic='Analysis', year=2003, resume=False)
+    assert cache._conn is None
+    assert not crawler.client.http.adapters['http://'].poolmanager.pools
+    requests_before = fake_api.state.requests
+
+    second = crawler.crawl_math_papers(topic='Analysis', year=2003, resume=False)
+    assert cache._conn is None
+    assert first == second == 250
+    # The reopened cache served every page of the second run
+    assert fake_api.state.requests == requests_before
+    assert cache.hits == 3
@@ -0,0 +1,61 @@
+import pytest
+from crawler.records import PaperRecord
+from database.checkpoints import CheckpointStore, STATUS_IN_PROGRESS, STATUS_PENDING
+from database.models import CrawlState, Paper
+from database.writer import PaperBatchWriter
+
+
+def _records(prefix, count):
+    return [PaperRecord.from_api({'paperId': f'{prefix}-{index}', 'title': f'{prefix} paper {index}'})
+            for index in range(count)]
+
+
+def _reload(session, state):
+    session.expire_all()
+    return session.query(CrawlState).filter_by(id=state.id).one()
+
+
+def test_checkpoint_advances_with_stored_page(session):
+    checkpoints = CheckpointStore(session)
+    state = checkpoints.load('checkpoint ok year:2001', 'Algebra', 2001)
+    writer = PaperBatchWriter(session)
+    for record in _records('checkpoint-ok', 3):
+        writer.add(record)
+
+    result = writer.flush(lambda result: checkpoints.advance(state, 100, papers_stored=result.inserted, requests=1))
+
+    assert result.inserted == 3
+    state = _reload(session, state)
+    assert (state.offset, state.status, state.papers_stored, state.requests) == (100, STATUS_IN_PROGRESS, 3, 1)
+
+
+def test_failed_write_does_not_advance_checkpoint(session, monkeypatch):
+    checkpoints = CheckpointStore(session)
+    state = checkpoints.load('checkpoint failed year:2001', 'Algebra', 2001)
+    writer = PaperBatchWriter(session)
+    for record in _records('checkpoint-failed', 3):
+        writer.add(record)
+
+    def fail(written):
+        raise RuntimeError('database went away')
+    monkeypatch.setattr(writer, '_write_relations', fail)
+
+    with pytest.raises(RuntimeError):
+        writer.flush(lambda result: checkpoints.advance(state, 100, papers_stored=result.inserted, requests=1))
+
+    state = _reload(session, state)
+    assert (state.offset, state.status, state.papers_stored, state.requests) == (0, STATUS_PENDING, 0, 0)
+    assert session.query(Paper).filter(Paper.paper_id.like('checkpoint-failed-%')).count() == 0
+
+
+def test_checkpoint_counts_papers_flushed_by_full_batches(session):
+    checkpoints = CheckpointStore(session)
+    state = checkpoints.load('checkpoint batches year:2001', 'Algebra', 2001)
+    writer = PaperBatchWriter(session, batch_size=2)
+    for record in _records('checkpoint-batches', 5):
+        writer.add(record)
+
+    result = writer.flush(lambda result: checkpoints.advance(state, 100, papers_stored=result.inserted, requests=1))
+
+    assert (result.inserted, writer.totals.inserted) == (5, 5)
+    assert _reload(session, state).papers_stored == 5
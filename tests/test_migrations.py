@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / 'src' / 'alembic.ini'
+
+
+def upgrade(engine):
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option('script_location', str(ALEMBIC_INI.parent / 'migrations'))
+    config.attributes['configure_logger'] = False
+    with engine.begin() as connection:
+        config.attributes['connection'] = connection
+        command.upgrade(config, '0001')
+
+
+def test_baseline_stops_on_title_collisions_until_they_are_resolved(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        # papers as created by init_db() before title_hash existed
+        connection.exec_driver_sql(
+            "CREATE TABLE papers (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL UNIQUE, authors VARCHAR, "
+            "abstract VARCHAR, year INTEGER, citations INTEGER, url VARCHAR, created_at DATETIME)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO papers (id, title, abstract, year) VALUES "
+            "(1, 'On Groups', 'first', 2001), (2, 'on groups.', 'second', 2001), (3, 'On Rings', '', 2002)"
+        )
+
+    with pytest.raises(RuntimeError) as failure:
+        upgrade(engine)
+    assert "id 1: 'On Groups', id 2: 'on groups.'" in str(failure.value)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT count(*) FROM papers").scalar() == 3
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM papers WHERE id = 2")
+    upgrade(engine)
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql("SELECT id, title_hash FROM papers ORDER BY id").fetchall()
+    assert [paper_id for paper_id, _ in rows] == [1, 3]
+    assert all(value is not None for _, value in rows)
+    engine.dispose()
@@ -0,0 +1,33 @@
+from crawler.scholar_crawler import build_search_query
+from database.checkpoints import STATUS_COMPLETED, STATUS_FAILED
+from database.models import CrawlState, Paper
+from database.writer import PaperBatchWriter
+
+
+def _state(session, topic, year):
+    session.expire_all()
+    return session.query(CrawlState).filter_by(query=build_search_query(topic, year), year=year).one()
+
+
+def test_failed_page_fails_unit_and_resumes_from_last_stored_page(crawler, session, monkeypatch):
+    write_relations = PaperBatchWriter._write_relations
+    calls = {'count': 0}
+
+    def flaky_write_relations(self, written):
+        calls['count'] += 1
+        if calls['count'] == 2:
+            raise RuntimeError('database went away')
+        return write_relations(self, written)
+    monkeypatch.setattr(PaperBatchWriter, '_write_relations', flaky_write_relations)
+
+    crawler.crawl_math_papers(topic='Logic', year=2003)
+
+    state = _state(session, 'Logic', 2003)
+    assert (state.status, state.offset, state.papers_stored) == (STATUS_FAILED, 100, 100)
+
+    monkeypatch.setattr(PaperBatchWriter, '_write_relations', write_relations)
+    crawler.crawl_math_papers(topic='Logic', year=2003)
+
+    state = _state(session, 'Logic', 2003)
+    assert (state.status, state.offset, state.papers_stored) == (STATUS_COMPLETED, 250, 250)
+    assert session.query(Paper).filter_by(topic='Logic', year=2003).count() == 250
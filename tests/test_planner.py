@@ -0,0 +1,50 @@
+from crawler.planner import ShardPlanner, format_year_filter
+
+
+class HitCountClient:
+    """Answers probes from a fixed number of hits per year"""
+
+    def __init__(self, per_year):
+        self.per_year = per_year
+        self.probed = []
+
+    def search(self, query, offset=0, limit=100, fields=None, year=None, max_retries=None):
+        self.probed.append(year)
+        start, _, end = year.partition('-')
+        years = range(int(start), int(end or start) + 1)
+        return {'total': sum(self.per_year.get(year, 0) for year in years), 'data': []}
+
+
+def test_year_filter_format():
+    assert format_year_filter(None) is None
+    assert format_year_filter(2001) == '2001'
+    assert format_year_filter(2001, 2001) == '2001'
+    assert format_year_filter(2001, 2005) == '2001-2005'
+
+
+def test_range_under_the_cap_is_one_shard():
+    client = HitCountClient({2001: 300, 2002: 300, 2003: 300})
+    shards = ShardPlanner(client, cap=1000).plan('Algebra', 2001, 2003)
+
+    assert [(shard.year_filter, shard.total) for shard in shards] == [('2001-2003', 900)]
+    assert client.probed == ['2001-2003']
+
+
+def test_bisection_probes_only_left_halves():
+    client = HitCountClient({2001: 600, 2002: 600, 2003: 300, 2004: 300})
+    planner = ShardPlanner(client, cap=1000)
+    shards = planner.plan('Algebra', 2001, 2004)
+
+    assert [(shard.year_filter, shard.total) for shard in shards] == [
+        ('2001', 600), ('2002', 600), ('2003-2004', 600)
+    ]
+    # The right half's count is its parent's minus the left half's
+    assert client.probed == ['2001-2004', '2001-2002', '2001']
+    assert planner.requests_made == 3
+
+
+def test_empty_shards_are_dropped_and_single_years_over_the_cap_kept():
+    client = HitCountClient({2001: 1500, 2004: 200})
+    shards = ShardPlanner(client, cap=1000).plan('Algebra', 2001, 2004)
+
+    assert [(shard.year_filter, shard.total) for shard in shards] == [('2001', 1500), ('2003-2004', 200)]
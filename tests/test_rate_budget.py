@@ -0,0 +1,35 @@
+import asyncio
+import time
+from database.rate_budget import SharedRateBudget
+
+
+def test_shared_acquire_does_not_block_event_loop(monkeypatch):
+    budget = SharedRateBudget(rate=1000, burst=10, name='test_event_loop')
+
+    def slow_reserve_shared():
+        # Stands in for a slow database round-trip
+        time.sleep(0.3)
+        return 0.0
+    monkeypatch.setattr(budget, '_reserve_shared', slow_reserve_shared)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        task = asyncio.create_task(ticker())
+        await budget.acquire_async()
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 10
+
+
+def test_shared_budget_paces_from_database():
+    budget = SharedRateBudget(rate=1, burst=1, name='test_pacing')
+    asyncio.run(budget.acquire_async())
+    # The second token in the shared bucket is a full second away
+    assert budget._reserve_shared() > 0.5
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from crawler.records import PaperRecord
+from crawler.refresh import CitationRefresher
+from database.models import Paper, PaperRefresh
+from database.writer import PaperBatchWriter
+
+
+class CountingClient:
+    """Stands in for SemanticScholarClient; every paper gained one citation"""
+
+    def __init__(self):
+        self.requested = []
+
+    def get_papers(self, ids, fields=None):
+        self.requested.extend(ids)
+        return [{'paperId': paper_id, 'citationCount': 1} for paper_id in ids]
+
+
+class FixedClient:
+    """Returns the given citation counts; other papers are not found"""
+
+    def __init__(self, counts):
+        self.counts = counts
+
+    def get_papers(self, ids, fields=None):
+        return [{'paperId': paper_id, 'citationCount': self.counts[paper_id]}
+                for paper_id in ids if paper_id in self.counts]
+
+
+def store(session, prefix, papers):
+    writer = PaperBatchWriter(session)
+    for paper in papers:
+        writer.add(PaperRecord.from_api(paper))
+    writer.flush()
+    # Papers stored by other tests are not due
+    others = session.query(Paper.id).filter(~Paper.paper_id.like(f'{prefix}%'))
+    session.query(PaperRefresh).filter(PaperRefresh.paper_id.in_(others.scalar_subquery())).delete(
+        synchronize_session=False)
+    session.query(Paper).filter(~Paper.paper_id.like(f'{prefix}%')).update(
+        {Paper.refreshed_at: datetime.utcnow() + timedelta(days=1)}, synchronize_session=False)
+    session.commit()
+
+
+def test_run_with_zero_min_age_refreshes_each_paper_once(session):
+    store(session, 'refresh-', [
+        {'paperId': f'refresh-{index}', 'title': f'Refresh paper {index}'} for index in range(5)
+    ])
+    client = CountingClient()
+
+    result = CitationRefresher(session, client=client, batch_size=2, min_age_days=0).run()
+
+    assert sorted(client.requested) == [f'refresh-{index}' for index in range(5)]
+    assert (result.checked, result.changed) == (5, 5)
+
+
+def test_unchanged_papers_are_not_rewritten(session):
+    store(session, 'steady-', [
+        {'paperId': 'steady-same', 'title': 'Steady paper', 'citationCount': 3},
+        {'paperId': 'steady-more', 'title': 'Rising paper', 'citationCount': 3},
+    ])
+    before = session.query(Paper.updated_at, Paper.refreshed_at).filter_by(paper_id='steady-same').one()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        refresher = CitationRefresher(session, client=FixedClient({'steady-same': 3, 'steady-more': 5}), min_age_days=0)
+        first = refresher.run()
+        paper_updates = [statement for statement in statements if statement.startswith('UPDATE papers')]
+        statements.clear()
+        second = refresher.run()
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    session.expire_all()
+
+    assert (first.checked, first.changed) == (2, 1)
+    # One statement carries the changed paper; the unchanged one is not part of any update
+    assert len(paper_updates) == 1
+    assert session.query(Paper.updated_at, Paper.refreshed_at).filter_by(paper_id='steady-same').one() == before
+    assert session.query(Paper.citations).filter_by(paper_id='steady-more').scalar() == 5
+    # Both were logged as checked, and nothing changed on the second pass
+    assert session.query(PaperRefresh).join(Paper, Paper.id == PaperRefresh.paper_id).filter(
+        Paper.paper_id.like('steady-%')).count() == 2
+    assert (second.checked, second.changed) == (2, 0)
+    assert not [statement for statement in statements if statement.startswith('UPDATE papers')]
@@ -0,0 +1,41 @@
+from datetime import datetime
+from crawler.scheduler import CrawlScheduler, ScheduledUnit, smoothed_yield
+from database.checkpoints import STATUS_COMPLETED
+
+
+def test_smoothed_yield_starts_at_the_prior():
+    assert smoothed_yield(0, 0, prior=40.0) == 40.0
+    assert smoothed_yield(1000, 10, prior=40.0) == (1000 + 40.0 * 5) / 15
+
+
+def test_run_stops_at_the_request_budget(crawler, fake_api):
+    requests_before = fake_api.state.requests
+    scheduler = CrawlScheduler(crawler, ['Applied Mathematics', 'Geometry'], range(2011, 2014),
+                               request_budget=7, topic_quota=100, slice_requests=2)
+
+    stats = scheduler.run()
+
+    assert stats['requests'] == 7
+    assert fake_api.state.requests - requests_before == 7
+    assert stats['papers_stored'] == stats['papers_processed'] > 0
+
+
+def test_run_keeps_each_topic_within_its_quota(crawler, fake_api):
+    requests_before = fake_api.state.requests
+    scheduler = CrawlScheduler(crawler, ['Logic', 'Number Theory'], range(2011, 2014),
+                               request_budget=100, topic_quota=4, slice_requests=3)
+
+    stats = scheduler.run()
+
+    assert stats['requests_by_topic'] == {'Logic': 4, 'Number Theory': 4}
+    assert fake_api.state.requests - requests_before == 8
+
+
+def test_completed_units_wait_until_stale(crawler):
+    scheduler = CrawlScheduler(crawler, ['Topology'], [2011], stale_days=30)
+    unit = ScheduledUnit('Topology', 2011, stored=250, requests=3, status=STATUS_COMPLETED,
+                         updated_at=datetime(2026, 1, 1))
+
+    assert scheduler.score(unit, datetime(2026, 1, 20)) == 0.0
+    # Past stale_days the unit comes back, discounted by age
+    assert 0.0 < scheduler.score(unit, datetime(2026, 3, 1)) < scheduler.score(unit, datetime(2026, 6, 1))
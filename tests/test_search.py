@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from crawler.records import PaperRecord
+from database.search import PaperSearch
+from database.writer import PaperBatchWriter
+
+
+@pytest.fixture(scope='module')
+def stored(database):
+    from database.session import get_session
+    session = get_session()
+    writer = PaperBatchWriter(session)
+    for paper_id, title, abstract, year, citations in [
+        ('search-1', 'Zebrafold lattices', 'On quillwort modules', 2001, 5),
+        ('search-2', 'Quillwort spectra', 'Zebrafold bounds for quillwort rings', 2003, 50),
+        ('search-3', 'Zebrafold tilings', 'Nothing else', 2005, 20),
+    ]:
+        writer.add(PaperRecord.from_api({'paperId': paper_id, 'title': title, 'abstract': abstract,
+                                         'year': year, 'citationCount': citations}))
+    writer.flush()
+    session.close()
+
+
+def test_every_word_must_match_title_or_abstract(session, stored):
+    hits = PaperSearch(session).search('zebrafold quillwort', sort='citations')
+    assert [hit.paper_id for hit in hits] == ['search-2', 'search-1']
+
+
+def test_filters_sorting_and_paging(session, stored):
+    search = PaperSearch(session)
+    assert [hit.paper_id for hit in search.search('zebrafold', sort='year')] == ['search-3', 'search-2', 'search-1']
+    assert [hit.paper_id for hit in search.search('zebrafold', year_from=2002, year_to=2004)] == ['search-2']
+    assert [hit.paper_id for hit in search.search('zebrafold', min_citations=10, sort='citations')] == [
+        'search-2', 'search-3'
+    ]
+    assert [hit.paper_id for hit in search.search('zebrafold', sort='citations', limit=1, offset=1)] == ['search-3']
+    assert search.search('   ') == []
+    with pytest.raises(ValueError):
+        search.search('zebrafold', sort='relevance')
+
+
+class CapturingSession:
+    """Pretends to be a Postgres session and keeps the statement instead of running it"""
+
+    class _Bind:
+        dialect = postgresql.dialect()
+
+    def __init__(self):
+        self.statement = None
+
+    def get_bind(self):
+        return self._Bind()
+
+    def execute(self, statement):
+        self.statement = statement
+        return []
+
+
+def test_postgres_parses_queries_with_websearch_to_tsquery():
+    session = CapturingSession()
+    PaperSearch(session).search('"prime gaps" or sieve -conjecture')
+
+    sql = str(session.statement.compile(dialect=postgresql.dialect()))
+    assert 'papers.search_vector @@ websearch_to_tsquery(' in sql
+    assert 'ts_rank_cd(papers.search_vector, websearch_to_tsquery(' in sql
+    params = session.statement.compile(dialect=postgresql.dialect()).params
+    assert '"prime gaps" or sieve -conjecture' in params.values()
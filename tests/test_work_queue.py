@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta
+from database.checkpoints import STATUS_COMPLETED, STATUS_FAILED
+from database.models import CrawlState
+from database.work_queue import WorkQueue
+
+
+def test_failed_units_are_not_claimed_again_but_are_reported(session):
+    queue = WorkQueue(session, worker_id='worker-a')
+    queue.seed([('queue-a year:2010', 'queue-a', 2010), ('queue-b year:2010', 'queue-b', 2010)])
+    # Units left by other tests are leased elsewhere
+    session.query(CrawlState).filter(~CrawlState.query.like('queue-%')).update(
+        {CrawlState.lease_expires_at: datetime.utcnow() + timedelta(days=1)}, synchronize_session=False)
+    session.commit()
+
+    first = queue.claim()
+    queue.release(first.id, STATUS_FAILED)
+    second = queue.claim()
+    queue.release(second.id, STATUS_COMPLETED)
+
+    assert (first.query, second.query) == ('queue-a year:2010', 'queue-b year:2010')
+    assert queue.claim() is None
+    assert [state.query for state in queue.failed()] == ['queue-a year:2010']
@@ -0,0 +1,56 @@
+from crawler.dedup import SeenSet
+from crawler.records import PaperRecord
+from database.models import Author, Paper, PaperAuthor, PaperField
+from database.writer import PaperBatchWriter
+
+
+def record(paper_id, title, **fields):
+    return PaperRecord.from_api({'paperId': paper_id, 'title': title, **fields})
+
+
+def test_papers_already_stored_or_repeated_in_a_batch_are_skipped(session):
+    writer = PaperBatchWriter(session)
+    writer.add(record('writer-1', 'Ergodic flows on tori'))
+    assert (writer.flush().inserted, writer.totals.inserted) == (1, 1)
+
+    writer.add(record('writer-2', 'ERGODIC  flows on tori!'))
+    writer.add(record('writer-3', 'Mixing of horocycles'))
+    writer.add(record('writer-4', 'Mixing of Horocycles'))
+    result = writer.flush()
+
+    assert (result.inserted, result.skipped) == (1, 2)
+    assert session.query(Paper).filter(Paper.paper_id.like('writer-%')).count() == 2
+
+
+def test_seen_set_drops_known_papers_before_the_database(session):
+    writer = PaperBatchWriter(session, seen=SeenSet())
+    writer.add(record('writer-seen', 'Rigidity of lattices'))
+    writer.flush()
+    writer.add(record('writer-seen', 'Rigidity of lattices'))
+
+    assert not writer._pending
+    assert writer.flush().skipped == 1
+
+
+def test_authors_and_fields_are_written_with_their_papers(session):
+    writer = PaperBatchWriter(session)
+    writer.add(record('writer-rel', 'Knot invariants and braids',
+                      authors=[{'authorId': 'writer-a1', 'name': 'Ada Byline'},
+                               {'authorId': None, 'name': 'Name Only'},
+                               {'authorId': 'writer-a1', 'name': 'Ada Byline'}],
+                      fieldsOfStudy=['Mathematics', 'Mathematics', 'Physics']))
+    writer.flush()
+
+    paper = session.query(Paper).filter_by(paper_id='writer-rel').one()
+    assert paper.authors == 'Ada Byline, Name Only, Ada Byline'
+    links = (
+        session.query(Author.name, Author.s2_author_id, PaperAuthor.position)
+        .join(PaperAuthor, PaperAuthor.author_id == Author.id)
+        .filter(PaperAuthor.paper_id == paper.id)
+        .order_by(PaperAuthor.position)
+        .all()
+    )
+    # An author listed twice keeps their first position
+    assert links == [('Ada Byline', 'writer-a1', 0), ('Name Only', None, 1)]
+    fields = session.query(PaperField.field).filter_by(paper_id=paper.id).order_by(PaperField.field)
+    assert [field for field, in fields] == ['Mathematics', 'Physics']